@@ -0,0 +1,85 @@
+"""
+Offspring throughput of the GA permutation operators.
+
+Compares the original list-based order crossover + swap mutation (one child per
+call, ``gene not in child`` membership test) with the batch NumPy operators in
+ga_operators.
+
+Usage: python bench_ga_operators.py [--tasks 50 200 1000] [--batch 48] [--seconds 1.0]
+"""
+import argparse
+import random
+import time
+from typing import Callable, List
+
+import numpy as np
+
+import ga_operators
+
+
+def legacy_crossover(parent1: List[int], parent2: List[int]) -> List[int]:
+    size = len(parent1)
+    start, end = sorted(random.sample(range(size), 2))
+    child = [None] * size
+    child[start:end] = parent1[start:end]
+
+    pointer = 0
+    for gene in parent2:
+        if gene not in child:
+            while child[pointer] is not None:
+                pointer += 1
+            child[pointer] = gene
+    return child
+
+
+def legacy_mutate(chromosome: List[int]) -> List[int]:
+    mutated = chromosome[:]
+    i, j = random.sample(range(len(mutated)), 2)
+    mutated[i], mutated[j] = mutated[j], mutated[i]
+    return mutated
+
+
+def offspring_per_second(produce: Callable[[], int], seconds: float) -> float:
+    produced = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        produced += produce()
+    return produced / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--batch", type=int, default=48, help="offspring per generation")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time spent per measurement")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'tasks':>6} {'operator':<24} {'offspring/s':>14} {'speedup':>9}")
+    for size in args.tasks:
+        parents_a = np.array([rng.permutation(size) for _ in range(args.batch)])
+        parents_b = np.array([rng.permutation(size) for _ in range(args.batch)])
+        lists_a = parents_a.tolist()
+        lists_b = parents_b.tolist()
+
+        def legacy() -> int:
+            for parent1, parent2 in zip(lists_a, lists_b):
+                legacy_mutate(legacy_crossover(parent1, parent2))
+            return args.batch
+
+        baseline = offspring_per_second(legacy, args.seconds)
+        print(f"{size:>6} {'legacy ox+swap':<24} {baseline:>14,.0f} {1.0:>8.1f}x")
+
+        for crossover_name, crossover in ga_operators.CROSSOVERS.items():
+            for mutation_name, mutation in ga_operators.MUTATIONS.items():
+                def batched() -> int:
+                    mutation(crossover(parents_a, parents_b, rng), rng)
+                    return args.batch
+
+                rate = offspring_per_second(batched, args.seconds)
+                label = f"batch {crossover_name}+{mutation_name}"
+                print(f"{size:>6} {label:<24} {rate:>14,.0f} {rate / baseline:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
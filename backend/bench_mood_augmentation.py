@@ -0,0 +1,134 @@
+"""
+Fit-time and accuracy benchmark for the mood model's class-balancing strategies.
+
+Generates synthetic per-day histories (MoodPredictor.DAILY_COLUMNS rows) where
+tomorrow's mood depends on today's focus, tasks, medication and note keywords,
+with a skewed mood distribution. For each MoodPredictor.AUGMENTATIONS strategy
+it fits on the older days and scores the held-out most recent days, recording
+median fit time, accuracy and balanced accuracy (mean per-class recall, which
+is what rebalancing is meant to improve). Results are written as JSON so runs
+can be diffed over time.
+
+Usage: python bench_mood_augmentation.py [--days 60 180 730] [--output bench_mood_augmentation.json]
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from bench_scheduler import git_revision
+from ml_models import MoodPredictor
+
+MOODS = ["good", "okay", "tired", "great", "sad", "frustrated"]
+
+
+def synthetic_daily(days: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Daily rows whose next-day mood follows a noisy rule over today's activity."""
+    frame = pd.DataFrame({
+        "day": pd.date_range("2024-01-01", periods=days, freq="D").strftime("%Y-%m-%d"),
+        "avg_hour": rng.uniform(7, 23, days),
+        "medications": rng.integers(0, 3, days),
+        "tasks_completed": rng.poisson(2.5, days),
+        "focus_minutes": rng.gamma(2.0, 45.0, days).astype(int),
+        "positive_words": rng.binomial(3, 0.3, days),
+        "negative_words": rng.binomial(3, 0.25, days),
+        "social_words": rng.binomial(2, 0.2, days),
+    })
+    # Latent wellbeing drives tomorrow's mood; thresholds leave the extremes rare
+    wellbeing = (
+        0.012 * frame["focus_minutes"] + 0.35 * frame["tasks_completed"] + 0.4 * frame["medications"]
+        + 0.6 * frame["positive_words"] - 0.7 * frame["negative_words"] + 0.3 * frame["social_words"]
+        - 0.08 * np.abs(frame["avg_hour"] - 14) + rng.normal(0, 0.8, days)
+    ).to_numpy()
+    cuts = np.quantile(wellbeing, [0.05, 0.15, 0.35, 0.75, 0.92])
+    by_wellbeing = ["sad", "frustrated", "tired", "okay", "good", "great"]
+    tomorrow = np.array(by_wellbeing)[np.searchsorted(cuts, wellbeing)]
+    # Day i's row records day i's mood, i.e. what day i - 1 predicted
+    frame["mood"] = np.concatenate([[rng.choice(MOODS)], tomorrow[:-1]])
+    return frame[MoodPredictor.DAILY_COLUMNS]
+
+
+def balanced_accuracy(truth: List[str], predicted: List[str]) -> float:
+    recalls = [np.mean([p == label for t, p in zip(truth, predicted) if t == label]) for label in set(truth)]
+    return float(np.mean(recalls)) if recalls else 0.0
+
+
+def run_strategy(strategy: str, train: pd.DataFrame, held_out: pd.DataFrame, repeat: int) -> Dict:
+    timings = []
+    predictor = None
+    for _ in range(repeat):
+        predictor = MoodPredictor(augmentation=strategy)
+        started = time.perf_counter()
+        fitted = predictor.fit_daily(train)
+        timings.append((time.perf_counter() - started) * 1000)
+        if not fitted:
+            return {"fitted": False}
+
+    # Held-out pairs: features of day i against the recorded mood of day i + 1
+    X = predictor.features_from_daily(held_out.iloc[:-1])
+    truth = held_out["mood"].iloc[1:].tolist()
+    predicted = predictor.predict_features(X)
+    return {
+        "fitted": True,
+        "fitMs": statistics.median(timings),
+        "accuracy": float(np.mean([t == p for t, p in zip(truth, predicted)])),
+        "balancedAccuracy": balanced_accuracy(truth, predicted),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=[60, 180, 730])
+    parser.add_argument("--strategies", nargs="+", default=list(MoodPredictor.AUGMENTATIONS))
+    parser.add_argument("--held-out", type=float, default=0.25, help="fraction of the most recent days scored")
+    parser.add_argument("--seeds", type=int, default=5, help="synthetic histories per size")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="bench_mood_augmentation.json")
+    args = parser.parse_args()
+    logging.getLogger("ml_models").setLevel(logging.WARNING)
+
+    runs = []
+    for days in args.days:
+        for strategy in args.strategies:
+            results = []
+            for seed in range(args.seeds):
+                daily = synthetic_daily(days, np.random.default_rng(seed))
+                split = int(days * (1 - args.held_out))
+                results.append(run_strategy(strategy, daily.iloc[:split], daily.iloc[split:], args.repeat))
+            fitted = [result for result in results if result["fitted"]]
+            if not fitted:
+                continue
+            run = {
+                "days": days,
+                "strategy": strategy,
+                "fitMs": round(statistics.median(r["fitMs"] for r in fitted), 3),
+                "accuracy": round(statistics.mean(r["accuracy"] for r in fitted), 4),
+                "balancedAccuracy": round(statistics.mean(r["balancedAccuracy"] for r in fitted), 4),
+                "fittedSeeds": len(fitted),
+            }
+            runs.append(run)
+            print(f"{days:>6} {strategy:<8} {run['fitMs']:>10.2f} ms  acc {run['accuracy']:.3f}  "
+                  f"balanced {run['balancedAccuracy']:.3f}")
+
+    report = {
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "settings": {"heldOut": args.held_out, "seeds": args.seeds, "repeat": args.repeat},
+        "runs": runs,
+    }
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Wrote {len(runs)} runs to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Speed and quality benchmark for the task scheduler.
+
+Generates synthetic todo sets (mixed deadlines, difficulty, urgency and moods)
+and runs the heuristic baseline plus every TaskSchedulerGA solver mode on them.
+For each run it records wall time, peak Python memory, final fitness and the
+gap versus the heuristic order, and writes the results as JSON so runs can be
+diffed over time.
+
+Usage: python bench_scheduler.py [--sizes 10 100 1000 5000] [--output bench_scheduler.json]
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from ml_models import TaskPrioritizer, TaskSchedulerGA
+
+MOODS = ["great", "good", "okay", "focused", "calm", "tired", "sad", "very_sad", None]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+
+def synthetic_tasks(size: int, rng: np.random.Generator) -> List[Dict]:
+    """Todos shaped like sanitised /api/eduhub/ai/schedule input."""
+    now = datetime.now(timezone.utc)
+    tasks = []
+    for idx in range(size):
+        task = {
+            "id": f"bench-{idx}",
+            "title": f"Synthetic task {idx}",
+            "difficulty": DIFFICULTIES[int(rng.integers(0, len(DIFFICULTIES)))],
+            "urgency": int(rng.integers(1, 6)),
+            "estimateMinutes": int(rng.choice([0, 15, 30, 60, 120])),
+            "completed": False,
+        }
+        # ~70% have deadlines, spread from overdue to a month out
+        if rng.random() < 0.7:
+            task["deadline"] = (now + timedelta(days=float(rng.uniform(-7, 30)))).isoformat()
+        tasks.append(task)
+    return tasks
+
+
+def heuristic_order(prioritizer: TaskPrioritizer, tasks: List[Dict], context: Dict) -> np.ndarray:
+    scores = np.array([prioritizer.heuristic_priority(task, context)[1] for task in tasks])
+    return np.argsort(-scores, kind="stable")
+
+
+def measure(run: Callable[[], object], repeat: int) -> Dict:
+    """Median wall time over `repeat` runs plus peak traced memory of one extra run."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"result": result, "wallMs": statistics.median(timings), "peakKb": peak / 1024}
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200, 1000, 5000])
+    parser.add_argument("--solvers", nargs="+", default=["heuristic", "ga", "exact"],
+                        help="heuristic and/or TaskSchedulerGA solver modes")
+    parser.add_argument("--moods", nargs="+", default=["okay", "tired", "none"],
+                        help="mood contexts to run ('none' for no mood)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--islands", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_scheduler.json")
+    args = parser.parse_args()
+
+    prioritizer = TaskPrioritizer()
+    scheduler = TaskSchedulerGA(prioritizer, islands=args.islands)
+    runs = []
+
+    for size in args.sizes:
+        tasks = synthetic_tasks(size, np.random.default_rng(args.seed + size))
+        for mood in args.moods:
+            context = {"mood": None if mood == "none" else mood}
+            profile = scheduler._task_profile(tasks, context)
+            baseline = heuristic_order(prioritizer, tasks, context)
+            baseline_fitness = float(scheduler._population_fitness(baseline[None, :], profile)[0])
+
+            for solver in args.solvers:
+                if solver == "heuristic":
+                    stats = measure(lambda: heuristic_order(prioritizer, tasks, context), args.repeat)
+                    fitness = baseline_fitness
+                    extra = {}
+                else:
+                    stats = measure(
+                        lambda: scheduler.optimize(tasks, context, solver=solver, seed=args.seed),
+                        args.repeat,
+                    )
+                    metadata = stats["result"]["metadata"]
+                    fitness = metadata["fitness"]
+                    extra = {
+                        "solverUsed": metadata.get("solver"),
+                        "generations": len(metadata.get("fitnessHistory", [])),
+                        "stopReason": metadata.get("stopReason"),
+                    }
+
+                gap = (fitness - baseline_fitness) / abs(baseline_fitness) if baseline_fitness else 0.0
+                runs.append({
+                    "tasks": size,
+                    "mood": context["mood"],
+                    "solver": solver,
+                    "wallMs": round(stats["wallMs"], 3),
+                    "peakKb": round(stats["peakKb"], 1),
+                    "fitness": fitness,
+                    "heuristicFitness": baseline_fitness,
+                    "gapVsHeuristic": gap,
+                    **extra,
+                })
+                print(f"{size:>6} {str(context['mood']):<8} {solver:<10} "
+                      f"{stats['wallMs']:>10.2f} ms {stats['peakKb']:>10.1f} KiB  gap {gap:+.4%}")
+
+    report = {
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "settings": {
+            "populationSize": scheduler.population_size,
+            "generations": scheduler.generations,
+            "islands": args.islands,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "runs": runs,
+    }
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Wrote {len(runs)} runs to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Multi-day calendar packing for ranked todos.
+
+Takes the scheduler's ranked task list and lays it out as concrete time blocks
+over the next N days. Each day has a focus capacity (minutes) estimated from
+the user's focus_sessions history, and blocks within a day are laid end to end
+from the start of the working window.
+
+Days are kept in a max segment tree over remaining capacity, so "first day in
+[release, deadline] with at least m free minutes" is an O(log days) descent and
+packing n tasks costs O(n log days) instead of scanning every day per task.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+DEFAULT_CAPACITY_MINUTES = 120
+MIN_CAPACITY_MINUTES = 30
+MAX_CAPACITY_MINUTES = 600
+
+
+class _CapacityTree:
+    """Max segment tree over per-day remaining minutes."""
+
+    def __init__(self, capacities: List[int]):
+        self.size = 1
+        while self.size < max(len(capacities), 1):
+            self.size *= 2
+        self.tree = [0] * (2 * self.size)
+        self.tree[self.size:self.size + len(capacities)] = capacities
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def remaining(self, day: int) -> int:
+        return self.tree[self.size + day]
+
+    def consume(self, day: int, minutes: int) -> None:
+        node = self.size + day
+        self.tree[node] -= minutes
+        node //= 2
+        while node:
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+
+    def first_fit(self, minutes: int, low: int, high: int) -> Optional[int]:
+        """Earliest day in [low, high] with at least `minutes` left, or None."""
+        if low > high:
+            return None
+        return self._descend(1, 0, self.size - 1, minutes, low, high)
+
+    def _descend(self, node: int, start: int, end: int, minutes: int, low: int, high: int) -> Optional[int]:
+        if end < low or start > high or self.tree[node] < minutes:
+            return None
+        if start == end:
+            return start
+        middle = (start + end) // 2
+        found = self._descend(2 * node, start, middle, minutes, low, high)
+        if found is None:
+            found = self._descend(2 * node + 1, middle + 1, end, minutes, low, high)
+        return found
+
+
+def estimate_daily_capacity(
+    sessions: Iterable[Dict],
+    now: Optional[datetime] = None,
+    lookback_days: int = 28,
+    default_minutes: int = DEFAULT_CAPACITY_MINUTES,
+) -> List[int]:
+    """Per-weekday focus capacity (Monday first) from completed focus sessions.
+
+    Each weekday gets the median minutes focused on the days it was active;
+    weekdays without history fall back to the overall median, then to
+    `default_minutes`.
+    """
+    now = now or datetime.now(timezone.utc)
+    since = (now - timedelta(days=lookback_days)).date()
+    per_day: Dict = {}
+    for session in sessions:
+        started = session.get("startTime")
+        if not isinstance(started, datetime) or session.get("status", "completed") != "completed":
+            continue
+        if started.tzinfo is None:
+            started = started.replace(tzinfo=timezone.utc)
+        day = started.astimezone(timezone.utc).date()
+        if day < since:
+            continue
+        per_day[day] = per_day.get(day, 0) + session.get("duration", 0) / 60
+
+    if not per_day:
+        return [default_minutes] * 7
+
+    overall = float(np.median(list(per_day.values())))
+    capacities = []
+    for weekday in range(7):
+        minutes = [total for day, total in per_day.items() if day.weekday() == weekday]
+        estimate = float(np.median(minutes)) if minutes else overall
+        capacities.append(int(min(max(round(estimate), MIN_CAPACITY_MINUTES), MAX_CAPACITY_MINUTES)))
+    return capacities
+
+
+def _parse_deadline(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        deadline = value
+    elif isinstance(value, str) and value:
+        try:
+            deadline = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    else:
+        return None
+    return deadline if deadline.tzinfo else deadline.replace(tzinfo=timezone.utc)
+
+
+def pack_calendar(
+    ranked_tasks: List[Dict],
+    weekday_capacity: List[int],
+    days: int = 7,
+    now: Optional[datetime] = None,
+    day_start_hour: int = 9,
+    focused_today_minutes: int = 0,
+    default_estimate: int = 30,
+    min_chunk: int = 15,
+) -> Dict:
+    """Place ranked tasks into day-by-day time blocks.
+
+    Tasks are taken in rank order. Each goes, whole, into the earliest day that
+    is not before any of its prerequisites and not after its deadline. If no day
+    before the deadline has room it is placed on the first day with room. Blocks
+    that end after the task's deadline (including later on the deadline's own
+    day) are marked late. A task longer than any day's free time is split into chunks
+    (of at least `min_chunk` minutes) over consecutive free days. Tasks with no
+    estimate use `default_estimate` minutes.
+    """
+    now = now or datetime.now(timezone.utc)
+    first_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    window_starts = [first_day + timedelta(days=offset, hours=day_start_hour) for offset in range(days)]
+
+    capacities = [weekday_capacity[(first_day + timedelta(days=offset)).weekday()] for offset in range(days)]
+    day_used = [0] * days
+    day_offset = [0] * days
+    if days:
+        # Today starts from now and only has what is left after focus already done
+        day_offset[0] = max(0, int((now - window_starts[0]).total_seconds() // 60))
+        until_midnight = int((first_day + timedelta(days=1) - window_starts[0]).total_seconds() // 60) - day_offset[0]
+        capacities[0] = max(0, min(capacities[0] - focused_today_minutes, until_midnight))
+    tree = _CapacityTree(capacities)
+
+    blocks: List[List[Dict]] = [[] for _ in range(days)]
+    finish_day: Dict[str, int] = {}
+    unscheduled = []
+
+    def place(day: int, task: Dict, minutes: int, part: Optional[int], deadline: Optional[datetime]) -> None:
+        start = window_starts[day] + timedelta(minutes=day_offset[day] + day_used[day])
+        end = start + timedelta(minutes=minutes)
+        tree.consume(day, minutes)
+        day_used[day] += minutes
+        blocks[day].append({
+            "taskId": task.get("id"),
+            "title": task.get("title", "Untitled"),
+            "gaRank": task.get("gaRank"),
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "minutes": minutes,
+            "part": part,
+            # Days only bound the search; the deadline's time of day decides lateness
+            "late": deadline is not None and end > deadline,
+        })
+
+    for task in ranked_tasks:
+        minutes = int(task.get("estimateMinutes") or 0) or default_estimate
+        release = 0
+        for dependency in task.get("dependencies") or []:
+            dependency_id = dependency.get("id") if isinstance(dependency, dict) else dependency
+            release = max(release, finish_day.get(str(dependency_id), 0))
+
+        deadline = _parse_deadline(task.get("deadline"))
+        last_day = days - 1 if deadline is None else min(days - 1, (deadline - first_day).days)
+
+        day = tree.first_fit(minutes, release, last_day)
+        if day is None:
+            day = tree.first_fit(minutes, max(release, last_day + 1), days - 1)
+        if day is not None:
+            place(day, task, minutes, None, deadline)
+            finish_day[str(task.get("id"))] = day
+            continue
+
+        # Too long for any single day: spread it over the earliest free days
+        left, part, day = minutes, 0, release
+        while left > 0:
+            day = tree.first_fit(min(left, min_chunk), day, days - 1)
+            if day is None:
+                break
+            part += 1
+            chunk = min(left, tree.remaining(day))
+            place(day, task, chunk, part, deadline)
+            left -= chunk
+        if left > 0:
+            unscheduled.append({"taskId": task.get("id"), "title": task.get("title", "Untitled"),
+                                "minutesUnplaced": left})
+        if part:
+            finish_day[str(task.get("id"))] = day if day is not None else days - 1
+
+    calendar = [
+        {
+            "date": window_starts[offset].date().isoformat(),
+            "capacityMinutes": capacities[offset],
+            "plannedMinutes": day_used[offset],
+            "blocks": blocks[offset],
+        }
+        for offset in range(days)
+    ]
+    return {"days": calendar, "unscheduled": unscheduled}
@@ -0,0 +1,116 @@
+"""
+Per-user daily stats kept up to date by the write paths (a small feature store).
+
+Each (user, UTC day) has one ``daily_user_stats`` document. The API's write
+paths update it atomically with ``$inc``/``$set``: moods, finished focus
+sessions, todo completions, todos created and deleted, and medication doses.
+The advisor, chat and ML endpoints then read today's facts with a single
+point lookup instead of rescanning focus_sessions, todos and medications.
+
+The number of pending todos is not a per-day fact, so it lives in one running
+document per user (``day == TOTALS_DAY``). That counter is seeded from a count
+the first time it is read. Until then, increments are skipped rather than
+applied to a missing value.
+"""
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from pymongo import ASCENDING
+
+logger = logging.getLogger(__name__)
+
+TOTALS_DAY = "all"
+
+
+def day_key(when: Optional[datetime] = None) -> str:
+    """UTC calendar day of `when` (now by default); naive datetimes are taken as UTC."""
+    when = when or datetime.now(timezone.utc)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.astimezone(timezone.utc).date().isoformat()
+
+
+class DailyStats:
+    """Atomic counters over the daily_user_stats collection."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._indexed = False
+        self._index_lock = threading.Lock()
+
+    def _ensure_index(self) -> None:
+        # Upserts key on (userId, day); the unique index keeps concurrent first writes to one document
+        if self._indexed:
+            return
+        with self._index_lock:
+            if self._indexed:
+                return
+            try:
+                self.collection.create_index([("userId", ASCENDING), ("day", ASCENDING)], unique=True)
+                self._indexed = True
+            except Exception as e:
+                logger.error(f"Could not create daily stats index: {e}")
+
+    def increment(self, user_id: str, when: Optional[datetime] = None, **counters) -> None:
+        """`$inc` the given counters on the user's document for the day of `when`."""
+        counters = {name: value for name, value in counters.items() if value}
+        if not counters:
+            return
+        self._ensure_index()
+        day = day_key(when)
+        self.collection.update_one(
+            {"userId": user_id, "day": day},
+            {"$inc": counters, "$set": {"updatedAt": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+
+    def record_mood(self, user_id: str, mood: str, when: Optional[datetime] = None, delta: int = 1) -> None:
+        """Count a mood entry on its day; `delta=-1` takes a deleted entry back out."""
+        label = (mood or "unknown").replace(".", "_").replace("$", "_")
+        self.increment(user_id, when, moodEntries=delta, **{f"moodCounts.{label}": delta})
+
+    def record_focus(self, user_id: str, started: datetime, seconds: int, sessions: int = 1) -> None:
+        """Focus time counts towards the day the session started, as the readers always have."""
+        self.increment(user_id, started, focusSeconds=seconds, focusSessions=sessions)
+
+    def record_completion(self, user_id: str, completed: bool, when: Optional[datetime] = None) -> None:
+        """A todo flipped to (or back from) completed; also moves it out of (or into) pending.
+
+        Un-completing needs the original completion time in `when`. Todos completed before
+        completedAt was stored have none, so only their pending count moves; guessing
+        today would push today's tasksCompleted below what was actually recorded.
+        """
+        delta = 1 if completed else -1
+        if completed or when is not None:
+            self.increment(user_id, when, tasksCompleted=delta)
+        self.adjust_pending(user_id, -delta)
+
+    def adjust_pending(self, user_id: str, delta: int) -> None:
+        if not delta:
+            return
+        self._ensure_index()
+        # Only counters that were already seeded; see pending_todos
+        self.collection.update_one(
+            {"userId": user_id, "day": TOTALS_DAY, "pendingTodos": {"$exists": True}},
+            {"$inc": {"pendingTodos": delta}, "$set": {"updatedAt": datetime.now(timezone.utc)}},
+        )
+
+    def for_day(self, user_id: str, when: Optional[datetime] = None) -> Dict:
+        """The stats document for the day of `when` (empty if nothing was recorded)."""
+        return self.collection.find_one({"userId": user_id, "day": day_key(when)}, {"_id": 0}) or {}
+
+    def pending_todos(self, user_id: str, todos) -> int:
+        """Running count of incomplete todos, seeded from `todos` on first use."""
+        totals = self.collection.find_one({"userId": user_id, "day": TOTALS_DAY}, {"pendingTodos": 1})
+        if totals and "pendingTodos" in totals:
+            return max(0, int(totals["pendingTodos"]))
+        self._ensure_index()
+        count = todos.count_documents({"userId": user_id, "completed": False})
+        self.collection.update_one(
+            {"userId": user_id, "day": TOTALS_DAY},
+            {"$set": {"pendingTodos": count, "updatedAt": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        return count
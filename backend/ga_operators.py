@@ -0,0 +1,162 @@
+"""
+Batch permutation operators for the task scheduler GA.
+
+Every operator works on a whole batch of chromosomes at once: a ``(batch, n)``
+integer matrix where each row is a permutation of ``range(n)``. Membership
+tests use boolean masks indexed by gene and position arrays instead of list
+scans, so each operator is O(n) per row.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def _cut_points(batch: int, size: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Two distinct positions per row, returned as (low, high)."""
+    first = rng.integers(0, size, batch)
+    second = rng.integers(0, size - 1, batch)
+    second += second >= first
+    return np.minimum(first, second), np.maximum(first, second)
+
+
+def tournament_select(
+    fitness: np.ndarray,
+    count: int,
+    rng: np.random.Generator,
+    k: int = 3,
+    pool_size: Optional[int] = None,
+) -> np.ndarray:
+    """Return `count` row indices, each the fittest of `k` random contenders.
+
+    fitness must be sorted best first when `pool_size` restricts the draw to
+    the top of the population.
+    """
+    pool_size = min(pool_size or fitness.shape[0], fitness.shape[0])
+    contenders = rng.integers(0, pool_size, (count, k))
+    winners = np.argmax(fitness[contenders], axis=1)
+    return contenders[np.arange(count), winners]
+
+
+def order_crossover(parents_a: np.ndarray, parents_b: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Order crossover (OX): keep a slice of parent A, fill the rest in parent B's order."""
+    batch, size = parents_a.shape
+    start, end = _cut_points(batch, size, rng)
+    positions = np.arange(size)
+    segment = (positions >= start[:, None]) & (positions < end[:, None])
+    rows = np.broadcast_to(np.arange(batch)[:, None], (batch, size))
+
+    used = np.zeros((batch, size), dtype=bool)
+    used[rows[segment], parents_a[segment]] = True
+
+    children = np.empty_like(parents_a)
+    children[segment] = parents_a[segment]
+    # Every row has as many free slots as unused genes, so row-major fill lines up
+    children[~segment] = parents_b[~used[rows, parents_b]]
+    return children
+
+
+def pmx_crossover(parents_a: np.ndarray, parents_b: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Partially mapped crossover (PMX)."""
+    batch, size = parents_a.shape
+    start, end = _cut_points(batch, size, rng)
+    positions = np.arange(size)
+    segment = (positions >= start[:, None]) & (positions < end[:, None])
+    rows = np.broadcast_to(np.arange(batch)[:, None], (batch, size))
+
+    used = np.zeros((batch, size), dtype=bool)
+    used[rows[segment], parents_a[segment]] = True
+    mapping = np.broadcast_to(positions, (batch, size)).copy()
+    mapping[rows[segment], parents_a[segment]] = parents_b[segment]
+
+    children = parents_b.copy()
+    children[segment] = parents_a[segment]
+
+    # Genes outside the slice that clash with it follow the mapping chain
+    outside_rows = rows[~segment]
+    genes = parents_b[~segment]
+    clashing = np.flatnonzero(used[outside_rows, genes])
+    while clashing.size:
+        genes[clashing] = mapping[outside_rows[clashing], genes[clashing]]
+        clashing = clashing[used[outside_rows[clashing], genes[clashing]]]
+    children[~segment] = genes
+    return children
+
+
+def swap_mutation(population: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Swap two random genes in every row."""
+    batch, size = population.shape
+    first, second = _cut_points(batch, size, rng)
+    rows = np.arange(batch)
+    mutated = population.copy()
+    mutated[rows, first] = population[rows, second]
+    mutated[rows, second] = population[rows, first]
+    return mutated
+
+
+def inversion_mutation(population: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Reverse a random inclusive slice of every row."""
+    batch, size = population.shape
+    start, end = _cut_points(batch, size, rng)
+    positions = np.broadcast_to(np.arange(size), (batch, size))
+    segment = (positions >= start[:, None]) & (positions <= end[:, None])
+    source = np.where(segment, start[:, None] + end[:, None] - positions, positions)
+    return population[np.arange(batch)[:, None], source]
+
+
+def scramble_mutation(population: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Shuffle a random inclusive slice of every row."""
+    batch, size = population.shape
+    start, end = _cut_points(batch, size, rng)
+    positions = np.broadcast_to(np.arange(size), (batch, size))
+    segment = (positions >= start[:, None]) & (positions <= end[:, None])
+    # Random sort keys inside the slice stay within [start - 0.5, end + 0.5)
+    keys = positions.astype(float)
+    jitter = start[:, None] - 0.5 + rng.random((batch, size)) * (end - start + 1)[:, None]
+    keys = np.where(segment, jitter, keys)
+    return population[np.arange(batch)[:, None], np.argsort(keys, axis=1, kind="stable")]
+
+
+def precedence_repair(
+    population: np.ndarray,
+    levels: np.ndarray,
+    level_edges: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+) -> np.ndarray:
+    """Reorder every row so each task comes after all of its prerequisites.
+
+    A task keeps its slot unless a prerequisite sits later, in which case it
+    moves to just after that prerequisite. Keys are propagated one topological
+    level at a time (each edge is touched once), then rows are sorted by
+    (key, level, original position). Rows that are already feasible come back
+    unchanged.
+
+    levels: longest-path depth of each task. level_edges[d] describes the edges
+    into tasks at depth d + 1 as (sources, targets, starts): sources sorted by
+    target, the distinct targets, and where each target's run of sources begins.
+    """
+    if not level_edges:
+        return population
+    batch, size = population.shape
+    rows = np.arange(batch)[:, None]
+    position = np.empty_like(population)
+    position[rows, population] = np.arange(size)
+
+    key = position.copy()
+    for sources, targets, starts in level_edges:
+        latest_prerequisite = np.maximum.reduceat(key[:, sources], starts, axis=1)
+        key[:, targets] = np.maximum(key[:, targets], latest_prerequisite)
+
+    # Columns are genes, so sorting the composite key yields the repaired rows
+    composite = (key * (int(levels.max()) + 1) + levels[None, :]) * size + position
+    return np.argsort(composite, axis=1)
+
+
+CROSSOVERS: Dict[str, Callable[[np.ndarray, np.ndarray, np.random.Generator], np.ndarray]] = {
+    "ox": order_crossover,
+    "pmx": pmx_crossover,
+}
+
+MUTATIONS: Dict[str, Callable[[np.ndarray, np.random.Generator], np.ndarray]] = {
+    "swap": swap_mutation,
+    "inversion": inversion_mutation,
+    "scramble": scramble_mutation,
+}
@@ -5,13 +5,21 @@ ML Models for Smart Features:
 3. Mood Pattern Recognition (XGBoost/KNN)
 4. Note Classification (SVM)
 """
+import copy
+import hashlib
+import os
 import pickle
-import random
 import numpy as np
 import pandas as pd
 from datetime import datetime, timezone
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import ga_operators
 
 logger = logging.getLogger('ml_models')
 
@@ -29,6 +37,14 @@ except ImportError as e:
     logger.warning(f"ML libraries not available: {e}")
     ML_AVAILABLE = False
 
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+    SCIPY_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"scipy not available, recommendations disabled: {e}")
+    SCIPY_AVAILABLE = False
+
 # ==================== 1. Recommendation Engine (KNN) ====================
 
 class RecommendationEngine:
@@ -36,18 +52,22 @@ class RecommendationEngine:
     
     def __init__(self):
         self.knn_model = None
-        self.user_matrix = None
+        self.user_matrix = None  # scipy.sparse CSR, users x items
         self.item_matrix = None
         self.user_ids = []
         self.item_ids = []
         self.item_features = {}
+        # Fit-time lookups: id -> matrix row, and per user the item columns rated above 3
+        self.user_index: Dict[str, int] = {}
+        self.liked_items = None  # scipy.sparse CSR; each row's columns in rating order
+        self._neighbours: Dict[int, np.ndarray] = {}  # row -> neighbour rows, memoised per fit
         
     def fit_user_based(self, ratings_data: List[Dict]):
         """
         Fit user-based collaborative filtering.
         ratings_data: [{"userId": str, "itemId": str, "rating": float}, ...]
         """
-        if not ML_AVAILABLE or not ratings_data:
+        if not ML_AVAILABLE or not SCIPY_AVAILABLE or not ratings_data:
             return False
         
         try:
@@ -55,20 +75,31 @@ class RecommendationEngine:
             if len(df) < 5:  # Need minimum data
                 return False
                 
-            # Create user-item matrix
-            pivot = df.pivot_table(
-                index='userId', 
-                columns='itemId', 
-                values='rating', 
-                fill_value=0
+            # Sparse user-item matrix straight from integer-coded ids; memory scales with ratings.
+            # Repeated (user, item) pairs are averaged, as pivot_table did.
+            user_codes, user_ids = pd.factorize(df['userId'])
+            item_codes, item_ids = pd.factorize(df['itemId'])
+            ratings = pd.DataFrame({'user': user_codes, 'item': item_codes, 'rating': df['rating'].astype(float),
+                                    'position': np.arange(len(df))})
+            ratings = ratings.groupby(['user', 'item'], sort=False).agg(rating=('rating', 'mean'), position=('position', 'min')).reset_index()
+            self.user_matrix = csr_matrix(
+                (ratings['rating'].to_numpy(), (ratings['user'].to_numpy(), ratings['item'].to_numpy())),
+                shape=(len(user_ids), len(item_ids)),
+            )
+            self.user_ids = user_ids.tolist()
+            self.item_ids = item_ids.tolist()
+            self.user_index = {user_id: row for row, user_id in enumerate(self.user_ids)}
+            self._neighbours = {}
+            # Each user's row lists liked items in the order they were rated (not column order)
+            liked = ratings[ratings['rating'] > 3].sort_values(['user', 'position'])
+            indptr = np.concatenate([[0], np.cumsum(np.bincount(liked['user'], minlength=len(self.user_ids)))])
+            self.liked_items = csr_matrix(
+                (np.ones(len(liked), dtype=np.int8), liked['item'].to_numpy(), indptr),
+                shape=self.user_matrix.shape,
             )
             
-            self.user_matrix = pivot.values
-            self.user_ids = pivot.index.tolist()
-            self.item_ids = pivot.columns.tolist()
-            
-            # Fit KNN (k=5)
-            self.knn_model = NearestNeighbors(n_neighbors=min(5, len(self.user_ids)), metric='cosine')
+            # Fit KNN (k=5); brute-force cosine works on the CSR matrix directly
+            self.knn_model = NearestNeighbors(n_neighbors=min(5, len(self.user_ids)), metric='cosine', algorithm='brute')
             self.knn_model.fit(self.user_matrix)
             
             logger.info(f"User-based KNN fitted with {len(self.user_ids)} users, {len(self.item_ids)} items")
@@ -77,46 +108,66 @@ class RecommendationEngine:
             logger.error(f"Error fitting user-based KNN: {e}")
             return False
     
-    def recommend_for_user(self, user_id: str, ratings_data: List[Dict], n_recommendations: int = 5) -> List[str]:
+    def _liked(self, row: int) -> np.ndarray:
+        """Item columns the user in `row` rated above 3, in the order they were rated."""
+        start, end = self.liked_items.indptr[row], self.liked_items.indptr[row + 1]
+        return self.liked_items.indices[start:end]
+
+    def recommend_for_user(self, user_id: str, n_recommendations: int = 5) -> List[str]:
         """
         Recommend items for a user using user-based collaborative filtering.
+        Items liked by the nearest neighbours (closest first) that the user has not
+        liked. Uses the fit-time indexes only, so the cost depends on k and the
+        neighbours' liked items rather than on total ratings.
         """
-        if not self.knn_model or user_id not in self.user_ids:
+        row = self.user_index.get(user_id) if self.knn_model is not None else None
+        if row is None:
             return []
         
         try:
-            user_idx = self.user_ids.index(user_id)
-            user_vector = self.user_matrix[user_idx].reshape(1, -1)
-            
-            # Find similar users
-            distances, indices = self.knn_model.kneighbors(user_vector)
-            
-            # Get items liked by similar users but not by current user
-            user_rated_items = set(
-                item['itemId'] for item in ratings_data 
-                if item.get('userId') == user_id and item.get('rating', 0) > 3
-            )
-            
-            recommendations = []
-            for neighbor_idx in indices[0][1:]:  # Skip self
-                neighbor_id = self.user_ids[neighbor_idx]
-                neighbor_items = [
-                    item['itemId'] for item in ratings_data
-                    if item.get('userId') == neighbor_id 
-                    and item.get('rating', 0) > 3
-                    and item['itemId'] not in user_rated_items
-                ]
-                recommendations.extend(neighbor_items)
-            
-            # Return top N unique recommendations
-            unique_recs = list(dict.fromkeys(recommendations))[:n_recommendations]
-            return unique_recs
+            # Find similar users (one kNN query per user per fit)
+            neighbours = self._neighbours.get(row)
+            if neighbours is None:
+                _, indices = self.knn_model.kneighbors(self.user_matrix[row])
+                neighbours = self._neighbours[row] = indices[0][indices[0] != row]
+            if not neighbours.size:
+                return []
+
+            # Neighbours' liked columns in neighbour order, first occurrence wins, minus the user's own likes
+            candidates = np.concatenate([self._liked(neighbour) for neighbour in neighbours])
+            _, first_seen = np.unique(candidates, return_index=True)
+            candidates = candidates[np.sort(first_seen)]
+            candidates = candidates[~np.isin(candidates, self._liked(row), assume_unique=True)]
+            return [self.item_ids[column] for column in candidates[:n_recommendations]]
         except Exception as e:
             logger.error(f"Error recommending for user {user_id}: {e}")
             return []
 
 # ==================== 2. Task Prioritization (XGBoost/SVM) ====================
 
+def _as_utc(value) -> Optional[datetime]:
+    """ISO string or datetime as an aware UTC datetime (naive taken as UTC); None if unparseable."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _booster_labels(model, rows: np.ndarray) -> np.ndarray:
+    """Encoded class per row via Booster.inplace_predict, skipping DataFrame/DMatrix setup.
+    `model` is an XGBClassifier or a bare Booster (e.g. after training continuation)."""
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    scores = booster.inplace_predict(rows)
+    if scores.ndim == 1:
+        # binary:logistic returns P(class 1)
+        return (scores > 0.5).astype(np.int64)
+    return scores.argmax(axis=1)
+
+
 class TaskPrioritizer:
     """Predict task priority and category using XGBoost or SVM."""
     
@@ -141,7 +192,8 @@ class TaskPrioritizer:
     # -------- Heuristic Helpers --------
     def calculate_priority_score(self, task: Dict, context: Optional[Dict] = None) -> float:
         """Compute heuristic priority score using weighted factors and fuzzy adjustments."""
-        urgency_raw = int(task.get('urgency', 3))
+        # update_todo lets urgency/difficulty be nulled; score those as the defaults
+        urgency_raw = int(task.get('urgency') or 3)
         # Convert urgency scale (1=highest urgency) into positive weight where larger is more urgent
         urgency_score = 6 - max(1, min(5, urgency_raw))
 
@@ -153,12 +205,15 @@ class TaskPrioritizer:
                     deadline_dt = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
                 else:
                     deadline_dt = deadline
+                if deadline_dt.tzinfo is None:
+                    # pymongo returns naive UTC datetimes
+                    deadline_dt = deadline_dt.replace(tzinfo=timezone.utc)
                 delta_days = (deadline_dt - datetime.now(timezone.utc)).days
                 days_remaining = max(-7, min(21, delta_days))
             except Exception:
                 days_remaining = 7
 
-        difficulty = task.get('difficulty', 'medium')
+        difficulty = task.get('difficulty') or 'medium'
         difficulty_map = {'easy': 1, 'medium': 2, 'hard': 3}
         difficulty_score = difficulty_map.get(difficulty, 2)
 
@@ -176,7 +231,7 @@ class TaskPrioritizer:
             return score
 
         mood = (context.get('mood') or '').lower()
-        difficulty = task.get('difficulty', 'medium').lower()
+        difficulty = (task.get('difficulty') or 'medium').lower()
 
         # Rule: medium difficulty + "okay" mood => treat as higher readiness
         if mood in {'okay', 'focused'} and difficulty == 'medium':
@@ -199,72 +254,68 @@ class TaskPrioritizer:
         score = self.calculate_priority_score(task, context)
         return self.map_score_to_priority(score), score
         
+    # Keyword flags: feature name -> substrings looked for in the lowercased title
+    KEYWORD_PATTERNS = {
+        'exam': ('exam', 'test'),
+        'report': ('report', 'write'),
+        'urgent': ('urgent', 'asap'),
+        'meeting': ('meeting', 'call'),
+        'study': ('study', 'learn'),
+        'gym': ('gym', 'workout'),
+        'personal': ('personal', 'home'),
+    }
+    DIFFICULTY_LEVELS = {'easy': 1, 'medium': 2, 'hard': 3}
+    # Column order shared by extract_features (training) and _feature_row (inference)
+    FEATURE_NAMES = [*KEYWORD_PATTERNS, 'days_until_deadline', 'hours_since_created', 'difficulty',
+                     'urgency', 'hour_of_day', 'day_of_week', 'has_deadline']
+
+    def _feature_row(self, task: Dict, now: datetime) -> np.ndarray:
+        """One task's features as a (1, n) float32 row in FEATURE_NAMES order."""
+        row = np.empty((1, len(self.FEATURE_NAMES)), dtype=np.float32)
+        values = row[0]
+        title = str(task.get('title', '')).lower()
+        for column, words in enumerate(self.KEYWORD_PATTERNS.values()):
+            values[column] = any(word in title for word in words)
+        column = len(self.KEYWORD_PATTERNS)
+        deadline = _as_utc(task.get('deadline'))
+        created = _as_utc(task.get('createdAt'))
+        values[column] = (deadline - now).days if deadline else 999
+        values[column + 1] = (now - created).total_seconds() / 3600 if created else 0.0
+        values[column + 2] = self.DIFFICULTY_LEVELS.get(task.get('difficulty') or 'medium', 2)
+        values[column + 3] = int(task.get('urgency') or 3)
+        values[column + 4] = now.hour
+        values[column + 5] = now.weekday()
+        values[column + 6] = 1 if task.get('deadline') else 0
+        return row
+
     def extract_features(self, tasks: List[Dict]) -> pd.DataFrame:
-        """Extract features from tasks for ML."""
-        features = []
-        for task in tasks:
-            title = str(task.get('title', '')).lower()
-            deadline = task.get('deadline')
-            created = task.get('createdAt')
-            difficulty = task.get('difficulty', 'medium')
-            urgency = int(task.get('urgency', 3))
-            
-            # Text features (keywords)
-            keywords = {
-                'exam': 'exam' in title or 'test' in title,
-                'report': 'report' in title or 'write' in title,
-                'urgent': 'urgent' in title or 'asap' in title,
-                'meeting': 'meeting' in title or 'call' in title,
-                'study': 'study' in title or 'learn' in title,
-                'gym': 'gym' in title or 'workout' in title,
-                'personal': 'personal' in title or 'home' in title,
-            }
-            
-            # Time features
-            now = datetime.now(timezone.utc)
-            days_until_deadline = None
-            if deadline:
-                try:
-                    if isinstance(deadline, str):
-                        deadline_dt = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
-                    else:
-                        deadline_dt = deadline
-                    days_until_deadline = (deadline_dt - now).days
-                except:
-                    days_until_deadline = None
-            
-            hours_since_created = None
-            if created:
-                try:
-                    if isinstance(created, str):
-                        created_dt = datetime.fromisoformat(created.replace('Z', '+00:00'))
-                    else:
-                        created_dt = created
-                    hours_since_created = (now - created_dt).total_seconds() / 3600
-                except:
-                    hours_since_created = None
-            
-            # Difficulty encoding
-            difficulty_map = {'easy': 1, 'medium': 2, 'hard': 3}
-            difficulty_num = difficulty_map.get(difficulty, 2)
-            
-            # Time of day
-            hour_of_day = now.hour
-            day_of_week = now.weekday()
-            
-            feature_dict = {
-                **keywords,
-                'days_until_deadline': days_until_deadline if days_until_deadline is not None else 999,
-                'hours_since_created': hours_since_created if hours_since_created is not None else 0,
-                'difficulty': difficulty_num,
-                'urgency': urgency,
-                'hour_of_day': hour_of_day,
-                'day_of_week': day_of_week,
-                'has_deadline': 1 if deadline else 0,
-            }
-            features.append(feature_dict)
-        
-        return pd.DataFrame(features)
+        """Extract features from tasks for ML.
+
+        Built column-wise: keyword flags are vectorized substring searches over
+        all titles, and deadline/creation deltas are one array subtraction
+        against a single `now` (naive timestamps are taken as UTC).
+        """
+        now = pd.Timestamp.now(tz='UTC')
+        titles = np.char.lower(np.array([str(task.get('title', '')) for task in tasks], dtype=str))
+        features = pd.DataFrame({
+            name: np.logical_or.reduce([np.char.find(titles, word) >= 0 for word in words])
+            for name, words in self.KEYWORD_PATTERNS.items()
+        }, index=pd.RangeIndex(len(tasks)))
+
+        deadline_values = pd.Series([task.get('deadline') for task in tasks], dtype=object)
+        deadlines = pd.to_datetime(deadline_values, errors='coerce', utc=True, format='ISO8601')
+        created = pd.to_datetime(pd.Series([task.get('createdAt') for task in tasks], dtype=object),
+                                 errors='coerce', utc=True, format='ISO8601')
+        # Timedelta.days floors, matching the previous per-task (deadline - now).days
+        features['days_until_deadline'] = (deadlines - now).dt.days.fillna(999).astype(np.int64)
+        features['hours_since_created'] = ((now - created).dt.total_seconds() / 3600).fillna(0.0)
+        features['difficulty'] = np.array(
+            [self.DIFFICULTY_LEVELS.get(task.get('difficulty') or 'medium', 2) for task in tasks], dtype=np.int64)
+        features['urgency'] = np.array([int(task.get('urgency') or 3) for task in tasks], dtype=np.int64)
+        features['hour_of_day'] = now.hour
+        features['day_of_week'] = now.weekday()
+        features['has_deadline'] = deadline_values.map(bool).astype(np.int64)
+        return features
     
     def fit_priority(self, tasks: List[Dict], priorities: List[str]):
         """
@@ -307,173 +358,188 @@ class TaskPrioritizer:
             return label
         
         try:
-            X = self.extract_features([task])
-            pred_encoded = self.priority_model.predict(X)[0]
-            return self.priority_encoder.inverse_transform([pred_encoded])[0]
+            row = self._feature_row(task, datetime.now(timezone.utc))
+            return str(self.priority_encoder.classes_[_booster_labels(self.priority_model, row)[0]])
         except Exception as e:
             logger.error(f"Error predicting priority: {e}")
             label, _ = self.heuristic_priority(task, context)
             return label
 
+    def predict_priorities(self, tasks: List[Dict], context: Optional[Dict] = None) -> List[str]:
+        """Predict priorities for many tasks with one feature build and one model call."""
+        if not tasks:
+            return []
+        if self.priority_model:
+            try:
+                rows = self.extract_features(tasks).to_numpy(dtype=np.float32)
+                return self.priority_encoder.classes_[_booster_labels(self.priority_model, rows)].tolist()
+            except Exception as e:
+                logger.error(f"Error predicting priorities: {e}")
+        return [self.heuristic_priority(task, context)[0] for task in tasks]
+
 # ==================== 3. Mood Pattern Recognition (XGBoost/KNN) ====================
 
 class MoodPredictor:
     """Predict mood based on patterns in mood, medication, and task data.
     Uses PCA for feature reduction to improve model performance."""
+
+    # Class-balancing strategies for training: GAN-generated rows, SMOTE-style
+    # interpolated rows, inverse-frequency sample weights, or nothing
+    AUGMENTATIONS = ("gan", "smote", "weights", "none")
     
-    def __init__(self):
+    def __init__(self, augmentation: str = "gan"):
+        if augmentation not in self.AUGMENTATIONS:
+            raise ValueError(f"Unknown augmentation '{augmentation}', expected one of {self.AUGMENTATIONS}")
+        self.augmentation = augmentation
         self.mood_model = None
         self.mood_encoder = None
         self.pca = None
         self.scaler = None
         self.n_components = 3  # Reduce to 3 principal components
-        self.class_gans: Dict[int, 'MoodDataGAN'] = {}
+        self.mood_gan: Optional['MoodDataGAN'] = None  # all class GANs, stacked
+        # Scaler + PCA folded into one affine map for inference: x @ projection + offset
+        self.projection = None
+        self.offset = None
+        # Incremental update state (see update_daily); trained_through is None until fit_daily
+        self.trained_through: Optional[str] = None
+        self.boost_params: Optional[Dict] = None
+        self.running_stats: Optional[Dict[str, np.ndarray]] = None
+        self.days_since_fit = 0
+        self.days_since_pca_check = 0
+
+    # Incremental maintenance: boosting rounds appended per update, full refit schedule,
+    # and the drift limits checked every PCA_REFRESH_DAYS
+    UPDATE_ROUNDS = 3
+    FULL_REFIT_AFTER_DAYS = 28
+    PCA_REFRESH_DAYS = 7
+    MEAN_DRIFT_LIMIT = 0.5     # running mean shift, in fitted standard deviations
+    PCA_CAPTURE_LIMIT = 0.9    # share of the refreshed PCA's variance the fitted basis must keep
+
+    # Column order shared by extract_features (training) and predict_next_mood (inference)
+    FEATURE_NAMES = ['mood', 'energy_level', 'stress_level', 'focus_level', 'productivity',
+                     'medications_taken', 'tasks_completed', 'focus_minutes', 'time_of_day',
+                     'day_of_week', 'is_weekend', 'sentiment_score', 'sleep_quality', 'social_activity']
+
+    def _fold_transforms(self) -> None:
+        """Precompute ((x - mean) / scale - pca_mean) @ components.T as x @ projection + offset."""
+        components = self.pca.components_ / self.scaler.scale_[None, :]
+        self.projection = components.T.astype(np.float32)
+        self.offset = -((self.scaler.mean_ / self.scaler.scale_ + self.pca.mean_) @ self.pca.components_.T).astype(np.float32)
         
+    MOOD_SCALE = {
+        'great': 9, 'good': 7, 'okay': 5, 'calm': 6,
+        'sad': 3, 'very_sad': 1, 'frustrated': 2, 'tired': 4
+    }
+    POSITIVE_WORDS = ['good', 'great', 'happy', 'excited', 'calm', 'peaceful', 'productive']
+    NEGATIVE_WORDS = ['sad', 'tired', 'stressed', 'anxious', 'frustrated', 'overwhelmed']
+    SOCIAL_WORDS = ['friend', 'family', 'party', 'meeting', 'social']
+
+    @staticmethod
+    def _record_stamps(records: List[Dict], *date_fields: str) -> pd.Series:
+        """UTC timestamp of each record's first non-empty date field (NaT if missing or unparseable)."""
+        raw = [record.get(date_fields[0]) for record in records]
+        for field in date_fields[1:]:
+            raw = [value or record.get(field) for value, record in zip(raw, records)]
+        return pd.to_datetime(pd.Series(raw, dtype=object), errors='coerce', utc=True, format='ISO8601')
+
+    @staticmethod
+    def _count_per_day(days: pd.Series, index: pd.Index, weights: Optional[pd.Series] = None) -> pd.Series:
+        if weights is None:
+            weights = pd.Series(1, index=days.index)
+        return weights.groupby(days).sum().reindex(index, fill_value=0)
+
+    # Per-day aggregate consumed by features_from_daily; also the shape of the Mongo $group rows
+    DAILY_COLUMNS = ['day', 'mood', 'avg_hour', 'medications', 'tasks_completed', 'focus_minutes',
+                     'positive_words', 'negative_words', 'social_words']
+
+    def aggregate_daily(self, mood_history: List[Dict], medication_history: List[Dict],
+                        task_completion: List[Dict], focus_sessions: List[Dict] = None) -> pd.DataFrame:
+        """Collapse raw events into one DAILY_COLUMNS row per (UTC) day with a mood entry.
+
+        Rows are in order of first appearance in mood_history. Every source is
+        normalized into a frame with a day column and aggregated with groupby,
+        so the cost stays linear in the amount of history.
+        """
+        focus_sessions = focus_sessions or []
+        stamps = self._record_stamps(mood_history, 'date')
+        entries = pd.DataFrame({
+            'stamp': stamps,
+            'day': stamps.dt.floor('D'),
+            'hour': stamps.dt.hour,
+            'mood': [mood.get('mood', '') for mood in mood_history],
+            'note': [str(mood.get('note') or '').lower() for mood in mood_history],
+        }).dropna(subset=['stamp'])
+        if entries.empty:
+            return pd.DataFrame(columns=self.DAILY_COLUMNS)
+        days = pd.Index(entries['day'].drop_duplicates())
+
+        # Most common mood per day; ties go to the mood entered most recently that day,
+        # whatever order mood_history is in (mood_aggregation's pushdown does the same)
+        counts = entries.groupby(['day', 'mood'], sort=False)['stamp'].agg(count='size', latest='max').reset_index()
+        modes = (counts.sort_values(['count', 'latest'], ascending=False, kind='stable')
+                 .drop_duplicates('day').set_index('day')['mood'])
+
+        # Keyword hits count once per word per day, across all of that day's notes
+        notes = entries['note'].to_numpy(dtype=str)
+
+        def word_hits(words: List[str]) -> np.ndarray:
+            hits = pd.DataFrame({word: np.char.find(notes, word) >= 0 for word in words}, index=entries.index)
+            return hits.groupby(entries['day'], sort=False).max().reindex(days).sum(axis=1).to_numpy()
+
+        completed = [task for task in task_completion if task.get('completed')]
+        finished = [session for session in focus_sessions if session.get('status') == 'completed']
+        return pd.DataFrame({
+            'day': days,
+            'mood': modes.reindex(days).to_numpy(),
+            'avg_hour': entries.groupby('day', sort=False)['hour'].mean().reindex(days).to_numpy(),
+            'medications': self._count_per_day(
+                self._record_stamps(medication_history, 'date', 'takenAt').dt.floor('D'), days).to_numpy(),
+            'tasks_completed': self._count_per_day(
+                self._record_stamps(completed, 'completedAt', 'createdAt').dt.floor('D'), days).to_numpy(),
+            'focus_minutes': self._count_per_day(
+                self._record_stamps(finished, 'startTime').dt.floor('D'), days,
+                pd.Series([session.get('duration', 0) // 60 for session in finished], dtype=np.int64),
+            ).to_numpy(),
+            'positive_words': word_hits(self.POSITIVE_WORDS),
+            'negative_words': word_hits(self.NEGATIVE_WORDS),
+            'social_words': word_hits(self.SOCIAL_WORDS),
+        }, columns=self.DAILY_COLUMNS)
+
+    def features_from_daily(self, daily: pd.DataFrame) -> pd.DataFrame:
+        """The 14 model features (FEATURE_NAMES order) from DAILY_COLUMNS rows."""
+        if daily.empty:
+            return pd.DataFrame()
+        mood_value = daily['mood'].map(self.MOOD_SCALE).fillna(5).to_numpy(dtype=float)
+        tasks_completed = daily['tasks_completed'].to_numpy()
+        focus_minutes = daily['focus_minutes'].to_numpy()
+        day_of_week = pd.DatetimeIndex(pd.to_datetime(daily['day'], utc=True)).weekday.to_numpy()
+        energy_level = np.clip(mood_value + tasks_completed * 0.5 + focus_minutes / 30, 1, 10)
+        sentiment = 5 + daily['positive_words'].to_numpy() - daily['negative_words'].to_numpy()
+        return pd.DataFrame({
+            'mood': mood_value,                                            # Feature 1
+            'energy_level': energy_level,                                  # Feature 2
+            'stress_level': np.clip(10 - mood_value + tasks_completed * 0.3, 1, 10),  # Feature 3
+            'focus_level': np.minimum(10, focus_minutes / 60 * 2),         # Feature 4
+            'productivity': np.clip(tasks_completed * 2 + focus_minutes / 30, 1, 10),  # Feature 5
+            'medications_taken': daily['medications'].to_numpy(),          # Feature 6
+            'tasks_completed': tasks_completed,                            # Feature 7
+            'focus_minutes': focus_minutes,                                # Feature 8
+            'time_of_day': daily['avg_hour'].to_numpy(),                   # Feature 9
+            'day_of_week': day_of_week,                                    # Feature 10
+            'is_weekend': (day_of_week >= 5).astype(int),                  # Feature 11
+            'sentiment_score': np.clip(sentiment, 1, 10),                  # Feature 12
+            'sleep_quality': np.clip(mood_value + energy_level / 2, 1, 10),  # Feature 13
+            'social_activity': (daily['social_words'].to_numpy() > 0).astype(int),  # Feature 14
+        }, columns=self.FEATURE_NAMES)
+
     def extract_features(self, mood_history: List[Dict], medication_history: List[Dict], 
                         task_completion: List[Dict], focus_sessions: List[Dict] = None) -> pd.DataFrame:
         """
         Extract comprehensive features for mood prediction.
         Creates 10+ features that will be reduced via PCA.
         """
-        features = []
-        focus_sessions = focus_sessions or []
-        
-        # Aggregate by day
-        daily_data = {}
-        for mood in mood_history:
-            date = mood.get('date')
-            if isinstance(date, str):
-                date_key = date.split('T')[0]
-            else:
-                date_key = date.date().isoformat() if hasattr(date, 'date') else str(date)
-            
-            if date_key not in daily_data:
-                daily_data[date_key] = {
-                    'moods': [],
-                    'mood_notes': [],
-                    'medications': 0,
-                    'tasks_completed': 0,
-                    'focus_minutes': 0,
-                    'time_of_day': None,
-                    'day_of_week': None,
-                    'hour_of_entry': []
-                }
-            
-            daily_data[date_key]['moods'].append(mood.get('mood', ''))
-            if mood.get('note'):
-                daily_data[date_key]['mood_notes'].append(mood.get('note', ''))
-            if mood.get('date'):
-                try:
-                    dt = datetime.fromisoformat(str(mood.get('date')).replace('Z', '+00:00'))
-                    daily_data[date_key]['hour_of_entry'].append(dt.hour)
-                    if not daily_data[date_key]['time_of_day']:
-                        daily_data[date_key]['time_of_day'] = dt.hour
-                    if not daily_data[date_key]['day_of_week']:
-                        daily_data[date_key]['day_of_week'] = dt.weekday()
-                except:
-                    pass
-        
-        for med in medication_history:
-            date = med.get('date') or med.get('takenAt')
-            if isinstance(date, str):
-                date_key = date.split('T')[0]
-            else:
-                date_key = date.date().isoformat() if hasattr(date, 'date') else str(date)
-            
-            if date_key in daily_data:
-                daily_data[date_key]['medications'] += 1
-        
-        for task in task_completion:
-            if task.get('completed'):
-                completed_at = task.get('completedAt') or task.get('createdAt')
-                if completed_at:
-                    if isinstance(completed_at, str):
-                        date_key = completed_at.split('T')[0]
-                    else:
-                        date_key = completed_at.date().isoformat() if hasattr(completed_at, 'date') else str(completed_at)
-                    
-                    if date_key in daily_data:
-                        daily_data[date_key]['tasks_completed'] += 1
-        
-        # Add focus time
-        for session in focus_sessions:
-            if session.get('status') == 'completed':
-                start_time = session.get('startTime')
-                if start_time:
-                    if isinstance(start_time, str):
-                        date_key = start_time.split('T')[0]
-                    else:
-                        date_key = start_time.date().isoformat() if hasattr(start_time, 'date') else str(start_time)
-                    
-                    if date_key in daily_data:
-                        duration_minutes = session.get('duration', 0) // 60
-                        daily_data[date_key]['focus_minutes'] += duration_minutes
-        
-        # Build comprehensive feature set
-        for date_key, data in daily_data.items():
-            if not data['moods']:
-                continue
-            
-            # Most common mood of the day
-            current_mood = max(set(data['moods']), key=data['moods'].count)
-            
-            # Mood encoding (1-10 scale)
-            mood_map = {
-                'great': 9, 'good': 7, 'okay': 5, 'calm': 6,
-                'sad': 3, 'very_sad': 1, 'frustrated': 2, 'tired': 4
-            }
-            mood_value = mood_map.get(current_mood, 5)
-            
-            # Energy level (inferred from mood and activity)
-            energy_level = max(1, min(10, mood_value + (data['tasks_completed'] * 0.5) + (data['focus_minutes'] / 30)))
-            
-            # Stress level (inferred from mood, medications, and task load)
-            stress_level = max(1, min(10, 10 - mood_value + (data['tasks_completed'] * 0.3)))
-            
-            # Focus level (from focus sessions)
-            focus_level = min(10, (data['focus_minutes'] / 60) * 2)  # 1 hour = 2 focus points, max 10
-            
-            # Productivity score
-            productivity = (data['tasks_completed'] * 2) + (data['focus_minutes'] / 30)
-            productivity = max(1, min(10, productivity))
-            
-            # Time features
-            avg_hour = sum(data['hour_of_entry']) / len(data['hour_of_entry']) if data['hour_of_entry'] else (data['time_of_day'] or 12)
-            is_weekend = 1 if (data['day_of_week'] or 0) >= 5 else 0
-            
-            # Note sentiment (simple: positive words = higher score)
-            note_text = ' '.join(data['mood_notes']).lower()
-            positive_words = ['good', 'great', 'happy', 'excited', 'calm', 'peaceful', 'productive']
-            negative_words = ['sad', 'tired', 'stressed', 'anxious', 'frustrated', 'overwhelmed']
-            sentiment_score = 5 + (sum(1 for w in positive_words if w in note_text) * 1) - (sum(1 for w in negative_words if w in note_text) * 1)
-            sentiment_score = max(1, min(10, sentiment_score))
-            
-            # Sleep quality (inferred from mood and energy)
-            sleep_quality = max(1, min(10, mood_value + (energy_level / 2)))
-            
-            # Social activity (from mood notes mentioning social events)
-            social_activity = 1 if any(word in note_text for word in ['friend', 'family', 'party', 'meeting', 'social']) else 0
-            
-            # Comprehensive feature vector (10+ features)
-            feature_dict = {
-                'mood': mood_value,                    # Feature 1
-                'energy_level': energy_level,           # Feature 2
-                'stress_level': stress_level,           # Feature 3
-                'focus_level': focus_level,             # Feature 4
-                'productivity': productivity,           # Feature 5
-                'medications_taken': data['medications'],  # Feature 6
-                'tasks_completed': data['tasks_completed'], # Feature 7
-                'focus_minutes': data['focus_minutes'],     # Feature 8
-                'time_of_day': avg_hour,                    # Feature 9
-                'day_of_week': data['day_of_week'] or 0,   # Feature 10
-                'is_weekend': is_weekend,                   # Feature 11
-                'sentiment_score': sentiment_score,         # Feature 12
-                'sleep_quality': sleep_quality,             # Feature 13
-                'social_activity': social_activity,         # Feature 14
-            }
-            features.append(feature_dict)
-        
-        return pd.DataFrame(features) if features else pd.DataFrame()
+        daily = self.aggregate_daily(mood_history, medication_history, task_completion, focus_sessions)
+        return self.features_from_daily(daily)
     
     def fit(self, mood_history: List[Dict], medication_history: List[Dict], 
             task_completion: List[Dict], target_moods: List[str], focus_sessions: List[Dict] = None):
@@ -486,6 +552,136 @@ class MoodPredictor:
         
         try:
             X = self.extract_features(mood_history, medication_history, task_completion, focus_sessions)
+        except Exception as e:
+            logger.error(f"Error extracting mood features: {e}")
+            return False
+        return self._fit_features(X, target_moods)
+
+    def fit_daily(self, daily: pd.DataFrame) -> bool:
+        """
+        Fit from DAILY_COLUMNS rows (e.g. a MongoDB $group by day) instead of raw events.
+        Each day's features are paired with the dominant mood of the next recorded day.
+        """
+        if not ML_AVAILABLE or len(daily) < 6:
+            return False
+        daily = daily.sort_values('day', kind='stable').reset_index(drop=True)
+        try:
+            X = self.features_from_daily(daily.iloc[:-1])
+        except Exception as e:
+            logger.error(f"Error building daily mood features: {e}")
+            return False
+        if not self._fit_features(X, daily['mood'].iloc[1:].fillna('okay').tolist()):
+            return False
+        # The last day's mood is the newest target; its own features wait for the next day
+        self.trained_through = str(daily['day'].iloc[-1])
+        return True
+
+    def refresh_daily(self, load_rows: Callable[[Optional[str]], pd.DataFrame], augmentation: Optional[str] = None) -> bool:
+        """
+        Bring the model up to date, incrementally when possible.
+        load_rows(since_day) returns DAILY_COLUMNS rows from that 'YYYY-MM-DD' day on,
+        or the whole training window for None. Falls back to a full fit_daily when
+        update_daily says a refit is due, or when `augmentation` changes the strategy.
+        """
+        if augmentation is not None and augmentation != self.augmentation:
+            if augmentation not in self.AUGMENTATIONS:
+                raise ValueError(f"Unknown augmentation '{augmentation}', expected one of {self.AUGMENTATIONS}")
+            self.augmentation = augmentation
+            self.trained_through = None
+        if getattr(self, 'trained_through', None) is not None:
+            try:
+                if self.update_daily(load_rows(self.trained_through)):
+                    return True
+            except Exception as e:
+                logger.warning(f"Incremental mood update failed, refitting: {e}")
+        return self.fit_daily(load_rows(None))
+
+    def update_daily(self, daily: pd.DataFrame) -> bool:
+        """
+        Append UPDATE_ROUNDS boosting rounds trained only on days after trained_through.
+        `daily` must start at trained_through, whose features pair with the next day's mood.
+        The scaler and PCA stay frozen so existing trees remain valid; running feature
+        statistics are updated instead. Returns False (model unchanged apart from those
+        statistics) when a full refit is due: on schedule, on an unseen mood label, or
+        when the PCA check finds the data has drifted.
+        """
+        if not ML_AVAILABLE or self.trained_through is None or self.mood_model is None:
+            return False
+        daily = daily.sort_values('day', kind='stable').reset_index(drop=True)
+        daily = daily[daily['day'].astype(str) >= self.trained_through].reset_index(drop=True)
+        if daily.empty or str(daily['day'].iloc[0]) != self.trained_through:
+            return False
+        if len(daily) < 2:
+            return True  # Still the same day; nothing new to learn from
+
+        targets = daily['mood'].iloc[1:].fillna('okay')
+        new_days = len(targets)
+        if not targets.isin(self.mood_encoder.classes_).all():
+            return False
+        if self.days_since_fit + new_days > self.FULL_REFIT_AFTER_DAYS:
+            return False
+
+        X = self.features_from_daily(daily.iloc[:-1]).fillna(0).to_numpy(dtype=float)
+        self._accumulate_stats(X)
+        self.days_since_pca_check += new_days
+        if self.days_since_pca_check >= self.PCA_REFRESH_DAYS:
+            self.days_since_pca_check = 0
+            if self._basis_drifted():
+                return False
+
+        y = np.searchsorted(self.mood_encoder.classes_, targets.to_numpy())  # classes_ is sorted
+        class_counts = self.running_stats['class_counts'] + np.bincount(y, minlength=len(self.mood_encoder.classes_))
+        self.running_stats['class_counts'] = class_counts
+        weights = None
+        if self.augmentation == 'weights':
+            # Same "balanced" weighting as _balance_classes, over every day seen so far
+            weights = (class_counts.sum() / (np.count_nonzero(class_counts) * np.maximum(class_counts, 1)))[y]
+
+        X_pca = X.astype(np.float32) @ self.projection + self.offset
+        booster = self.mood_model.get_booster() if hasattr(self.mood_model, 'get_booster') else self.mood_model
+        self.mood_model = xgb.train(self.boost_params, xgb.DMatrix(X_pca, label=y, weight=weights),
+                                    num_boost_round=self.UPDATE_ROUNDS, xgb_model=booster)
+        self.days_since_fit += new_days
+        self.trained_through = str(daily['day'].iloc[-1])
+        logger.info(f"Mood model updated with {new_days} new days ({booster.num_boosted_rounds()} -> "
+                    f"{self.mood_model.num_boosted_rounds()} rounds)")
+        return True
+
+    def _accumulate_stats(self, X: np.ndarray) -> None:
+        """Running count, sum and sum of outer products of real (unaugmented) feature rows."""
+        stats = self.running_stats
+        stats['count'] = stats['count'] + X.shape[0]
+        stats['sum'] = stats['sum'] + X.sum(axis=0)
+        stats['outer'] = stats['outer'] + X.T @ X
+
+    def _basis_drifted(self) -> bool:
+        """Refresh PCA from the running statistics and compare it with the fitted basis.
+
+        A new basis would invalidate the boosted trees, so instead of swapping it in
+        this reports drift (and the caller refits) when the running mean has moved
+        more than MEAN_DRIFT_LIMIT fitted standard deviations, or the fitted
+        components keep less than PCA_CAPTURE_LIMIT of the variance the refreshed
+        components would.
+        """
+        stats = self.running_stats
+        mean = stats['sum'] / stats['count']
+        shift = np.abs(mean - self.scaler.mean_) / self.scaler.scale_
+        if shift.max() > self.MEAN_DRIFT_LIMIT:
+            logger.info(f"Mood features drifted (mean shift {shift.max():.2f} std); full refit due")
+            return True
+        # Covariance in the fitted scaler's units, where the fitted components live
+        covariance = (stats['outer'] / stats['count'] - np.outer(mean, mean)) / np.outer(self.scaler.scale_, self.scaler.scale_)
+        components = self.pca.components_
+        captured = np.trace(components @ covariance @ components.T)
+        best = np.sort(np.linalg.eigvalsh(covariance))[::-1][:components.shape[0]].sum()
+        if best > 0 and captured / best < self.PCA_CAPTURE_LIMIT:
+            logger.info(f"Mood PCA basis drifted (keeps {captured / best:.1%} of refreshed variance); full refit due")
+            return True
+        return False
+
+    def _fit_features(self, X: pd.DataFrame, target_moods: List[str]) -> bool:
+        """Train scaler, PCA, class balancing (self.augmentation) and XGBoost on a FEATURE_NAMES frame."""
+        try:
             if X is None or X.empty or len(X) < 5:
                 return False
             
@@ -497,38 +693,7 @@ class MoodPredictor:
             y_encoded = self.mood_encoder.fit_transform(y)
             
             feature_matrix = X.astype(float).values
-            augmented_matrix = feature_matrix
-            augmented_labels = y_encoded
-
-            # Train class-specific GANs to augment data when classes are imbalanced
-            synthetic_rows = []
-            synthetic_labels = []
-            self.class_gans = {}
-            if feature_matrix.shape[0] >= 5 and len(np.unique(y_encoded)) > 1:
-                class_counts = np.bincount(y_encoded)
-                target_count = int(class_counts.max()) if class_counts.size else 0
-                for label_idx in np.unique(y_encoded):
-                    class_data = feature_matrix[y_encoded == label_idx]
-                    if class_data.shape[0] < 3:
-                        continue
-                    gan = MoodDataGAN(feature_dim=class_data.shape[1])
-                    try:
-                        gan.train(class_data)
-                        need_count = target_count - class_data.shape[0]
-                        if need_count > 0:
-                            generated = gan.generate(need_count)
-                            if generated.size:
-                                synthetic_rows.append(generated)
-                                synthetic_labels.extend([label_idx] * generated.shape[0])
-                    except Exception as gan_err:
-                        logger.debug(f"GAN augmentation skipped for label {label_idx}: {gan_err}")
-                    else:
-                        self.class_gans[label_idx] = gan
-
-            if synthetic_rows:
-                augmented_matrix = np.vstack([augmented_matrix, *synthetic_rows])
-                augmented_labels = np.concatenate([augmented_labels, np.array(synthetic_labels, dtype=augmented_labels.dtype)])
-                logger.info(f"Mood GAN augmentation added {sum(len(r) for r in synthetic_rows)} samples")
+            augmented_matrix, augmented_labels, sample_weight = self._balance_classes(feature_matrix, y_encoded)
 
             # Standardize features before PCA
             self.scaler = StandardScaler()
@@ -551,7 +716,24 @@ class MoodPredictor:
                 learning_rate=0.1,
                 random_state=42
             )
-            self.mood_model.fit(X_pca, augmented_labels)
+            self.mood_model.fit(X_pca, augmented_labels, sample_weight=sample_weight)
+            self._fold_transforms()
+
+            # Starting point for update_daily
+            n_classes = len(self.mood_encoder.classes_)
+            self.boost_params = {
+                'max_depth': 5, 'learning_rate': 0.1, 'seed': 42,
+                **({'objective': 'multi:softprob', 'num_class': n_classes} if n_classes > 2 else {'objective': 'binary:logistic'}),
+            }
+            self.running_stats = {
+                'count': feature_matrix.shape[0],
+                'sum': feature_matrix.sum(axis=0),
+                'outer': feature_matrix.T @ feature_matrix,
+                'class_counts': np.bincount(y_encoded, minlength=n_classes),
+            }
+            self.trained_through = None
+            self.days_since_fit = 0
+            self.days_since_pca_check = 0
             
             y_pred = self.mood_model.predict(X_pca)
             acc = accuracy_score(augmented_labels, y_pred)
@@ -561,12 +743,80 @@ class MoodPredictor:
             logger.error(f"Error fitting mood model: {e}")
             return False
     
+    def _balance_classes(self, features: np.ndarray, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """Apply self.augmentation; returns (rows, labels, sample weights or None)."""
+        self.mood_gan = None
+        class_counts = np.bincount(labels)
+        strategy = getattr(self, 'augmentation', 'gan')
+        if strategy == 'none' or features.shape[0] < 5 or class_counts.size < 2:
+            return features, labels, None
+        if strategy == 'weights':
+            # "balanced" weights: every class contributes the same total weight
+            present = class_counts > 0
+            weights = np.zeros(class_counts.size)
+            weights[present] = labels.size / (present.sum() * class_counts[present])
+            return features, labels, weights[labels]
+
+        missing = class_counts.max() - class_counts
+        if strategy == 'smote':
+            synthetic_rows, synthetic_labels = self._smote_rows(features, labels, missing)
+        else:
+            # Class GANs (trained together) top every class up to the majority count
+            try:
+                gan = MoodDataGAN(feature_dim=features.shape[1], n_classes=class_counts.size, seed=42)
+                gan.train(features, labels, classes=missing > 0)
+                synthetic_rows, synthetic_labels = gan.generate(missing)
+            except Exception as gan_err:
+                logger.debug(f"GAN augmentation skipped: {gan_err}")
+                return features, labels, None
+            self.mood_gan = gan
+        if not len(synthetic_rows):
+            return features, labels, None
+        logger.info(f"Mood {strategy} augmentation added {len(synthetic_rows)} samples")
+        return (np.vstack([features, synthetic_rows]),
+                np.concatenate([labels, synthetic_labels.astype(labels.dtype)]), None)
+
+    @staticmethod
+    def _smote_rows(features: np.ndarray, labels: np.ndarray, missing: np.ndarray,
+                    k: int = 5, seed: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+        """SMOTE: each new row lies at a random point between a class row and one of its k nearest class neighbours."""
+        rng = np.random.default_rng(seed)
+        rows, row_labels = [], []
+        for label in np.flatnonzero(missing):
+            members = features[labels == label]
+            if members.shape[0] < 2:
+                continue
+            # Neighbours on standardised features, so wide-range columns do not dominate
+            spread = members.std(axis=0)
+            scaled = members / np.where(spread > 0, spread, 1.0)
+            distances = ((scaled[:, None, :] - scaled[None, :, :]) ** 2).sum(axis=2)
+            np.fill_diagonal(distances, np.inf)
+            neighbours = np.argsort(distances, axis=1)[:, :min(k, members.shape[0] - 1)]
+
+            base = rng.integers(0, members.shape[0], missing[label])
+            partner = neighbours[base, rng.integers(0, neighbours.shape[1], missing[label])]
+            gap = rng.random((missing[label], 1))
+            rows.append(members[base] + gap * (members[partner] - members[base]))
+            row_labels.append(np.full(missing[label], label))
+        if not rows:
+            return np.empty((0, features.shape[1])), np.empty(0, dtype=int)
+        return np.vstack(rows), np.concatenate(row_labels)
+
+    def predict_features(self, X: pd.DataFrame) -> List[str]:
+        """Predicted next mood for each FEATURE_NAMES row (e.g. features_from_daily output)."""
+        if self.mood_model is None or not self.pca or not self.scaler:
+            return ['okay'] * len(X)
+        if getattr(self, 'projection', None) is None:
+            self._fold_transforms()
+        rows = X[self.FEATURE_NAMES].fillna(0).to_numpy(dtype=np.float32)
+        return [str(label) for label in self.mood_encoder.classes_[_booster_labels(self.mood_model, rows @ self.projection + self.offset)]]
+
     def predict_next_mood(self, current_context: Dict) -> str:
         """
         Predict next mood based on current context.
         Uses PCA-reduced features for prediction.
         """
-        if not self.mood_model or not self.pca or not self.scaler:
+        if self.mood_model is None or not self.pca or not self.scaler:
             return 'okay'  # Default
         
         try:
@@ -582,141 +832,179 @@ class MoodPredictor:
             productivity = current_context.get('productivity',
                 max(1, min(10, (current_context.get('tasks_completed', 0) * 2))))
             
-            feature_dict = {
-                'mood': mood_value,
-                'energy_level': energy_level,
-                'stress_level': stress_level,
-                'focus_level': focus_level,
-                'productivity': productivity,
-                'medications_taken': current_context.get('medications_taken', 0),
-                'tasks_completed': current_context.get('tasks_completed', 0),
-                'focus_minutes': current_context.get('focus_minutes', 0),
-                'time_of_day': now.hour,
-                'day_of_week': now.weekday(),
-                'is_weekend': 1 if now.weekday() >= 5 else 0,
-                'sentiment_score': current_context.get('sentiment_score', 5),
-                'sleep_quality': current_context.get('sleep_quality', 5),
-                'social_activity': current_context.get('social_activity', 0),
-            }
-            
-            # Ensure all columns match training data
-            X = pd.DataFrame([feature_dict])
-            
-            # Standardize and apply PCA
-            X_scaled = self.scaler.transform(X)
-            X_pca = self.pca.transform(X_scaled)
-            
+            # FEATURE_NAMES order
+            row = np.array([[
+                mood_value,
+                energy_level,
+                stress_level,
+                focus_level,
+                productivity,
+                current_context.get('medications_taken', 0),
+                current_context.get('tasks_completed', 0),
+                current_context.get('focus_minutes', 0),
+                now.hour,
+                now.weekday(),
+                1 if now.weekday() >= 5 else 0,
+                current_context.get('sentiment_score', 5),
+                current_context.get('sleep_quality', 5),
+                current_context.get('social_activity', 0),
+            ]], dtype=np.float32)
+
+            # Standardize and apply PCA as one matrix product (models pickled before folding get it lazily)
+            if getattr(self, 'projection', None) is None:
+                self._fold_transforms()
+            X_pca = row @ self.projection + self.offset
+
             # Predict
-            pred_encoded = self.mood_model.predict(X_pca)[0]
-            return self.mood_encoder.inverse_transform([pred_encoded])[0]
+            pred_encoded = _booster_labels(self.mood_model, X_pca)[0]
+            return str(self.mood_encoder.classes_[pred_encoded])
         except Exception as e:
             logger.error(f"Error predicting mood: {e}")
             return 'okay'
 
 class MoodDataGAN:
-    """Lightweight GAN to generate synthetic mood feature vectors."""
-
-    def __init__(self, feature_dim: int, noise_dim: int = 8, learning_rate: float = 0.005):
+    """Lightweight GANs generating synthetic mood feature vectors, one per mood class.
+
+    Every class gets its own linear-tanh generator and logistic discriminator,
+    but their weights are stacked along a leading class axis (Wg: classes x
+    noise x features, Wd: classes x features) and trained together, so one
+    batched matmul step updates all classes at once. Each class stops updating once
+    its generator loss stops improving; training ends when every class has
+    converged.
+    """
+
+    def __init__(self, feature_dim: int, n_classes: int = 1, noise_dim: int = 8,
+                 learning_rate: float = 0.005, seed: Optional[int] = None):
         self.feature_dim = feature_dim
+        self.n_classes = n_classes
         self.noise_dim = noise_dim
-        self.learning_rate = learning_rate
+        self.learning_rate = np.float32(learning_rate)
+        self.rng = np.random.default_rng(seed)
 
         # Generator parameters
-        self.Wg = np.random.randn(noise_dim, feature_dim) * 0.1
-        self.bg = np.zeros(feature_dim)
+        self.Wg = (self.rng.standard_normal((n_classes, noise_dim, feature_dim)) * 0.1).astype(np.float32)
+        self.bg = np.zeros((n_classes, feature_dim), dtype=np.float32)
 
         # Discriminator parameters
-        self.Wd = np.random.randn(feature_dim, 1) * 0.1
-        self.bd = 0.0
+        self.Wd = (self.rng.standard_normal((n_classes, feature_dim)) * 0.1).astype(np.float32)
+        self.bd = np.zeros(n_classes, dtype=np.float32)
 
-        self.feature_mean = None
-        self.feature_std = None
-        self.is_trained = False
+        self.feature_mean = np.zeros((n_classes, feature_dim), dtype=np.float32)
+        self.feature_std = np.ones((n_classes, feature_dim), dtype=np.float32)
+        self.trained = np.zeros(n_classes, dtype=bool)
+        self.epochs_trained = np.zeros(n_classes, dtype=int)
 
     @staticmethod
     def _sigmoid(x: np.ndarray) -> np.ndarray:
         return 1.0 / (1.0 + np.exp(-x))
 
-    @staticmethod
-    def _tanh(x: np.ndarray) -> np.ndarray:
-        return np.tanh(x)
-
-    def _normalize(self, data: np.ndarray) -> np.ndarray:
-        if self.feature_mean is None or self.feature_std is None:
-            self.feature_mean = data.mean(axis=0)
-            self.feature_std = data.std(axis=0)
-            self.feature_std[self.feature_std == 0] = 1.0
-        return (data - self.feature_mean) / self.feature_std
-
-    def _denormalize(self, data: np.ndarray) -> np.ndarray:
-        if self.feature_mean is None or self.feature_std is None:
-            return data
-        return (data * self.feature_std) + self.feature_mean
-
     def _generator(self, noise: np.ndarray) -> np.ndarray:
-        hidden = noise @ self.Wg + self.bg
-        return self._tanh(hidden)
-
-    def train(self, real_data: np.ndarray, epochs: int = 300, batch_size: int = 32):
-        real_array = np.asarray(real_data, dtype=float)
-        if real_array.ndim != 2 or real_array.shape[0] < 4:
-            raise ValueError("Not enough data to train GAN")
-
-        normalized = self._normalize(real_array)
-        num_samples = normalized.shape[0]
-        batch_size = min(batch_size, num_samples)
+        """(classes, batch, noise) -> (classes, batch, features), still normalised."""
+        return np.tanh(noise @ self.Wg + self.bg[:, None, :])
+
+    def train(self, real_data: np.ndarray, labels: np.ndarray, epochs: int = 300, batch_size: int = 32,
+              min_samples: int = 4, check_every: int = 25, tolerance: float = 1e-3, patience: int = 3,
+              classes: Optional[np.ndarray] = None) -> np.ndarray:
+        """Fit every class (of the `classes` mask, if given) with at least `min_samples` rows.
+        Returns the mask of trained classes.
+
+        Batches are drawn with replacement from index tables generated up front
+        for all epochs. Every `check_every` epochs each class's mean generator
+        loss over the window is compared with the best window so far; a class
+        is frozen once `patience` windows in a row have not improved on it by
+        the relative `tolerance`. A slow but steady descent keeps training.
+        """
+        data = np.asarray(real_data, dtype=np.float32)
+        labels = np.asarray(labels)
+        if data.ndim != 2 or data.shape[1] != self.feature_dim:
+            raise ValueError("GAN training data must be (samples, feature_dim)")
+
+        counts = np.bincount(labels, minlength=self.n_classes)[:self.n_classes]
+        active = counts >= min_samples
+        if classes is not None:
+            active &= np.asarray(classes, dtype=bool)
+        if not active.any():
+            return self.trained
+
+        # Rows grouped by class: class c occupies [starts[c], starts[c] + counts[c])
+        order = np.argsort(labels, kind='stable')
+        grouped = data[order]
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        for label in np.flatnonzero(active):
+            rows = grouped[starts[label]:starts[label] + counts[label]]
+            self.feature_mean[label] = rows.mean(axis=0)
+            std = rows.std(axis=0)
+            std[std == 0] = 1.0
+            self.feature_std[label] = std
+        normalized = (grouped - self.feature_mean[labels[order]]) / self.feature_std[labels[order]]
+
+        batch = int(min(batch_size, counts[active].max()))
+        # Sample indices for every epoch and class at once; frozen or skipped classes still draw rows but take zero steps
+        offsets = (self.rng.random((epochs, self.n_classes, batch)) * np.maximum(counts, 1)[None, :, None]).astype(int)
+        sample_index = np.minimum(starts[None, :, None] + offsets, max(len(grouped) - 1, 0))
+        step = (self.learning_rate * active).astype(np.float32)
+        window_losses = np.zeros((self.n_classes, 2), dtype=np.float32)
+        best_generator_loss = np.full(self.n_classes, np.inf, dtype=np.float32)
+        stale_windows = np.zeros(self.n_classes, dtype=int)
+        eps = 1e-7
 
         for epoch in range(epochs):
-            idx = np.random.choice(num_samples, batch_size, replace=True)
-            batch_real = normalized[idx]
-
-            noise = np.random.randn(batch_size, self.noise_dim)
+            batch_real = normalized[sample_index[epoch]]
+            noise = self.rng.standard_normal((self.n_classes, batch, self.noise_dim), dtype=np.float32)
             fake = self._generator(noise)
 
-            # Update discriminator
-            combined = np.vstack([batch_real, fake])
-            labels = np.concatenate([np.ones(batch_size), np.zeros(batch_size)])
-            logits = combined @ self.Wd + self.bd
-            preds = self._sigmoid(logits)
-
-            error = preds.flatten() - labels
-            grad_Wd = combined.T @ error.reshape(-1, 1) / (2 * batch_size)
-            grad_bd = error.mean()
-
-            self.Wd -= self.learning_rate * grad_Wd
-            self.bd -= self.learning_rate * grad_bd
-
-            # Update generator
-            logits_fake = fake @ self.Wd + self.bd
-            preds_fake = self._sigmoid(logits_fake)
-            grad_logits = preds_fake - 1
-            grad_fake = grad_logits @ self.Wd.T
-            grad_hidden = grad_fake * (1 - fake ** 2)
-            grad_Wg = noise.T @ grad_hidden / batch_size
-            grad_bg = grad_hidden.mean(axis=0)
-
-            self.Wg -= self.learning_rate * grad_Wg
-            self.bg -= self.learning_rate * grad_bg
-
-            if epoch % 100 == 0:
-                eps = 1e-9
-                d_loss = -np.mean(np.log(preds[:batch_size] + eps) + np.log(1 - preds[batch_size:] + eps))
-                g_loss = -np.mean(np.log(preds_fake + eps))
-                logger.debug(f"MoodDataGAN epoch {epoch}: D_loss={d_loss:.4f}, G_loss={g_loss:.4f}")
-
-        self.is_trained = True
-
-    def generate(self, n_samples: int) -> np.ndarray:
-        if not self.is_trained or n_samples <= 0:
-            return np.empty((0, self.feature_dim))
-
-        noise = np.random.randn(n_samples, self.noise_dim)
-        synthetic = self._generator(noise)
-        return self._denormalize(synthetic)
+            # Update discriminators: real rows labelled 1, generated rows 0
+            preds_real = self._sigmoid((batch_real @ self.Wd[:, :, None])[:, :, 0] + self.bd[:, None])
+            preds_fake = self._sigmoid((fake @ self.Wd[:, :, None])[:, :, 0] + self.bd[:, None])
+            error_real = preds_real - 1.0
+            grad_Wd = (error_real[:, None, :] @ batch_real + preds_fake[:, None, :] @ fake)[:, 0, :] / (2 * batch)
+            grad_bd = (error_real.sum(axis=1) + preds_fake.sum(axis=1)) / (2 * batch)
+            self.Wd -= step[:, None] * grad_Wd
+            self.bd -= step * grad_bd
+            window_losses[:, 0] -= np.mean(np.log(preds_real + eps) + np.log(1 - preds_fake + eps), axis=1)
+
+            # Update generators against the refreshed discriminators
+            preds_fake = self._sigmoid((fake @ self.Wd[:, :, None])[:, :, 0] + self.bd[:, None])
+            grad_hidden = (preds_fake - 1.0)[:, :, None] * self.Wd[:, None, :] * (1 - fake ** 2)
+            self.Wg -= step[:, None, None] * (noise.transpose(0, 2, 1) @ grad_hidden) / batch
+            self.bg -= step[:, None] * grad_hidden.mean(axis=1)
+            window_losses[:, 1] -= np.mean(np.log(preds_fake + eps), axis=1)
+            self.epochs_trained += active
+
+            if (epoch + 1) % check_every == 0:
+                # Mean losses over the window, so single noisy batches do not decide convergence
+                losses = window_losses / check_every
+                window_losses[:] = 0
+                logger.debug(f"MoodDataGAN epoch {epoch + 1}: D_loss={losses[active, 0].round(4)}, "
+                             f"G_loss={losses[active, 1].round(4)}")
+                improved = losses[:, 1] < best_generator_loss * (1 - tolerance)
+                best_generator_loss = np.where(improved, losses[:, 1], best_generator_loss)
+                stale_windows = np.where(improved, 0, stale_windows + 1)
+                active &= stale_windows < patience
+                step = (self.learning_rate * active).astype(np.float32)
+                if not active.any():
+                    break
+
+        self.trained |= self.epochs_trained > 0
+        return self.trained
+
+    def generate(self, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """`counts[c]` synthetic rows for each trained class c, as (rows, labels)."""
+        counts = np.where(self.trained, np.maximum(np.asarray(counts, dtype=int), 0), 0)
+        if not counts.any():
+            return np.empty((0, self.feature_dim), dtype=np.float32), np.empty(0, dtype=int)
+
+        noise = self.rng.standard_normal((self.n_classes, int(counts.max()), self.noise_dim), dtype=np.float32)
+        synthetic = self._generator(noise) * self.feature_std[:, None, :] + self.feature_mean[:, None, :]
+        keep = np.arange(synthetic.shape[1])[None, :] < counts[:, None]
+        labels = np.broadcast_to(np.arange(self.n_classes)[:, None], keep.shape)
+        return synthetic[keep], labels[keep]
 
 class TaskSchedulerGA:
     """Genetic algorithm to optimize daily task ordering."""
 
+    SOLVERS = ("ga", "exact", "auto")
+
     def __init__(
         self,
         prioritizer: Optional[TaskPrioritizer] = None,
@@ -724,14 +1012,68 @@ class TaskSchedulerGA:
         generations: int = 60,
         crossover_rate: float = 0.75,
         mutation_rate: float = 0.15,
+        patience: Optional[int] = None,
+        budget_ms: Optional[float] = None,
+        islands: int = 1,
+        migration_interval: int = 10,
+        migrants: int = 2,
+        pool_size: Optional[int] = None,
+        island_threshold: int = 150,
+        warm_start_patience: int = 5,
+        crossover: str = "ox",
+        mutation: str = "swap",
     ):
+        if crossover not in ga_operators.CROSSOVERS:
+            raise ValueError(f"Unknown crossover '{crossover}', expected one of {tuple(ga_operators.CROSSOVERS)}")
+        if mutation not in ga_operators.MUTATIONS:
+            raise ValueError(f"Unknown mutation '{mutation}', expected one of {tuple(ga_operators.MUTATIONS)}")
         self.prioritizer = prioritizer or TaskPrioritizer()
         self.population_size = population_size
         self.generations = generations
         self.crossover_rate = crossover_rate
         self.mutation_rate = mutation_rate
+        # Anytime controls: stop after `patience` generations without improvement
+        # or once `budget_ms` of wall-clock time is spent, whichever comes first
+        self.patience = patience
+        self.budget_ms = budget_ms
+        # Island model: only worth the process hop for large task lists
+        self.islands = max(1, islands)
+        self.migration_interval = max(1, migration_interval)
+        self.migrants = migrants
+        self.pool_size = pool_size
+        self.island_threshold = island_threshold
+        self.warm_start_patience = warm_start_patience
+        self.crossover = crossover
+        self.mutation = mutation
+        self._crossover_op = ga_operators.CROSSOVERS[crossover]
+        self._mutation_op = ga_operators.MUTATIONS[mutation]
+
+    def optimize(
+        self,
+        tasks: List[Dict],
+        context: Optional[Dict] = None,
+        solver: str = "ga",
+        budget_ms: Optional[float] = None,
+        patience: Optional[int] = None,
+        warm_start: Optional[List[str]] = None,
+        seed: Optional[int] = None,
+    ) -> Dict:
+        """Order tasks for the day.
+
+        solver: "ga" evolves an order, "exact" solves the task x position
+        assignment problem directly, "auto" uses the exact solver whenever the
+        objective has no cross-task terms. When todos have dependencies, auto
+        runs the GA and exact falls back to list scheduling ("list").
+        budget_ms / patience override the instance defaults for this run.
+        warm_start is the previous best order as todo ids; the GA population is
+        seeded from it after repairing for added and removed todos.
+        seed makes GA runs reproducible (unless a time budget cuts them short).
+        """
+        started = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        if solver not in self.SOLVERS:
+            raise ValueError(f"Unknown solver '{solver}', expected one of {self.SOLVERS}")
 
-    def optimize(self, tasks: List[Dict], context: Optional[Dict] = None) -> Dict:
         if not tasks:
             return {
                 "schedule": [],
@@ -739,71 +1081,333 @@ class TaskSchedulerGA:
             }
 
         context = context or {}
-        num_tasks = len(tasks)
-        index_list = list(range(num_tasks))
 
-        base_metrics = []
-        priority_map = {"high": 3, "medium": 2, "low": 1}
-        for idx, task in enumerate(tasks):
-            label, score = self.prioritizer.heuristic_priority(task, context)
-            weight = priority_map[label]
-            base_metrics.append(
-                {
-                    "index": idx,
-                    "label": label,
-                    "score": score,
-                    "weight": weight,
-                }
-            )
+        # Per-task terms are computed once; fitness is then pure array math
+        profile = self._task_profile(tasks, context)
+        warm = False
+
+        if solver == "auto":
+            solver = "ga" if self._has_cross_task_terms(profile) else "exact"
+
+        if solver == "exact":
+            best_chromosome = self._solve_assignment(profile)
+            stop_reason = "solved"
+            if self._has_cross_task_terms(profile):
+                # List scheduling: the assignment order becomes the priority list
+                # and is repaired into the nearest dependency-feasible order
+                best_chromosome = self._repair(best_chromosome[None, :], profile)[0]
+                solver = "list"
+                stop_reason = "repaired"
+            best_fitness = float(self._population_fitness(best_chromosome[None, :], profile)[0])
+            best_generation = 0
+            fitness_history = []
+            islands = 0
+        else:
+            budget_ms = self.budget_ms if budget_ms is None else budget_ms
+            patience = self.patience if patience is None else patience
+            deadline = started + budget_ms / 1000.0 if budget_ms else None
+            seed_order = self._repair_seed_order(tasks, warm_start, profile) if warm_start else None
+            if seed_order is not None:
+                # Seeded runs start near the optimum, so a short plateau is enough
+                patience = patience or self.warm_start_patience
+                warm = True
+            if self.islands > 1 and len(tasks) >= self.island_threshold:
+                run = self._evolve_islands(
+                    profile, deadline=deadline, patience=patience, seed_order=seed_order, rng=rng
+                )
+                islands = self.islands
+            else:
+                population = self._initial_population(profile, self.population_size, rng, seed_order=seed_order)
+                run = self._evolve(profile, population=population, deadline=deadline, patience=patience, rng=rng)
+                islands = 1
+            best_chromosome = run["best"]
+            best_fitness = run["fitness"]
+            best_generation = run["generation"]
+            fitness_history = run["history"]
+            stop_reason = run["stopReason"]
+
+        return self._build_result(
+            tasks,
+            best_chromosome,
+            profile,
+            {
+                "solver": solver,
+                "fitness": best_fitness,
+                "evaluatedGenerations": best_generation,
+                "fitnessHistory": fitness_history,
+                "stopReason": stop_reason,
+                "elapsedMs": round((time.perf_counter() - started) * 1000, 2),
+                "islands": islands,
+                "warmStart": warm,
+                "dependencyEdges": profile["dependency_edges"],
+            },
+        )
 
+    def _initial_population(
+        self,
+        profile: Dict,
+        size: int,
+        rng: np.random.Generator,
+        seed_heuristic: bool = True,
+        seed_order: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        num_tasks = profile["weight"].shape[0]
+        heuristic_order = np.argsort(-profile["score"], kind="stable")
+        population = np.empty((size, num_tasks), dtype=np.int64)
+        for row in range(size):
+            population[row] = rng.permutation(heuristic_order)
+        if seed_order is not None and num_tasks > 1:
+            # Warm start: half the population are small perturbations of the previous optimum
+            for row in range(size // 2):
+                population[row] = seed_order
+                for _ in range(row % 3 + (1 if row else 0)):
+                    i, j = rng.integers(0, num_tasks, size=2)
+                    population[row, i], population[row, j] = population[row, j], population[row, i]
+            if size > 1:
+                population[1] = heuristic_order
+            return population
         # Seed population with heuristic ordering as baseline
-        heuristic_order = sorted(index_list, key=lambda i: base_metrics[i]["score"], reverse=True)
-        population = [heuristic_order[:]]
-        for _ in range(self.population_size - 1):
-            shuffled = heuristic_order[:]
-            random.shuffle(shuffled)
-            population.append(shuffled)
+        if seed_heuristic:
+            population[0] = heuristic_order
+        return population
+
+    def _repair_seed_order(self, tasks: List[Dict], previous_order: List[str], profile: Dict) -> Optional[np.ndarray]:
+        """Map a previous best order (todo ids) onto the current task list.
+
+        Removed todos are dropped; new todos are merged in by heuristic score so
+        they land next to tasks of similar priority.
+        """
+        id_to_index = {}
+        for idx, task in enumerate(tasks):
+            task_id = task.get("id") or task.get("_id")
+            if task_id is not None:
+                id_to_index[str(task_id)] = idx
+
+        survivors = []
+        seen = set()
+        for task_id in previous_order:
+            idx = id_to_index.get(str(task_id))
+            if idx is not None and idx not in seen:
+                survivors.append(idx)
+                seen.add(idx)
+        if not survivors:
+            return None
+
+        scores = profile["score"]
+        newcomers = sorted((idx for idx in range(len(tasks)) if idx not in seen), key=lambda idx: -scores[idx])
+        merged = []
+        pointer = 0
+        for idx in survivors:
+            while pointer < len(newcomers) and scores[newcomers[pointer]] > scores[idx]:
+                merged.append(newcomers[pointer])
+                pointer += 1
+            merged.append(idx)
+        merged.extend(newcomers[pointer:])
+        return np.asarray(merged, dtype=np.int64)
+
+    def _evolve(
+        self,
+        profile: Dict,
+        population: Optional[np.ndarray] = None,
+        generations: Optional[int] = None,
+        deadline: Optional[float] = None,
+        patience: Optional[int] = None,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Dict:
+        """Run the genetic algorithm on a single population.
+
+        deadline is a ``time.perf_counter()`` value; the best order found so far
+        is returned once it passes. The final (unscored) population is returned
+        too so islands can resume from it after migration.
+        """
+        rng = rng or np.random.default_rng()
+        if population is None:
+            population = self._initial_population(profile, self.population_size, rng)
+        population = self._repair(population, profile)
+        generations = self.generations if generations is None else generations
+        population_size, num_tasks = population.shape
 
         fitness_history = []
-        best_chromosome = None
+        best_chromosome = population[0].copy()
         best_fitness = float("-inf")
         best_generation = 0
+        elite_count = min(population_size, max(2, population_size // 5))
+        stop_reason = "generations"
+
+        for generation in range(generations):
+            fitness = self._population_fitness(population, profile)
+            ranking = np.argsort(-fitness, kind="stable")
+            population = population[ranking]
+            fitness = fitness[ranking]
+            fitness_history.append(float(fitness[0]))
+
+            if fitness[0] > best_fitness:
+                best_fitness = float(fitness[0])
+                best_chromosome = population[0].copy()
+                best_generation = generation + 1
 
-        for generation in range(self.generations):
-            scored_population = []
-            for chromosome in population:
-                fitness_score = self._fitness(chromosome, tasks, base_metrics, context)
-                scored_population.append((fitness_score, chromosome))
+            # A single task has nothing to reorder
+            if num_tasks < 2:
+                stop_reason = "trivial"
+                break
+            if patience and generation + 1 - best_generation >= patience:
+                stop_reason = "plateau"
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                stop_reason = "budget"
+                break
 
-            scored_population.sort(key=lambda item: item[0], reverse=True)
-            fitness_history.append(scored_population[0][0])
+            offspring = self._repair(self._breed(population, fitness, rng), profile)
+            population = np.vstack([population[:elite_count], offspring])
 
-            if scored_population[0][0] > best_fitness:
-                best_fitness = scored_population[0][0]
-                best_chromosome = scored_population[0][1][:]
-                best_generation = generation + 1
+        return {
+            "best": best_chromosome,
+            "fitness": best_fitness,
+            "generation": best_generation,
+            "history": fitness_history,
+            "stopReason": stop_reason,
+            "population": population,
+        }
 
-            elite_count = max(2, self.population_size // 5)
-            next_population = [chromosome[:] for _, chromosome in scored_population[:elite_count]]
+    def _evolve_islands(
+        self,
+        profile: Dict,
+        deadline: Optional[float] = None,
+        patience: Optional[int] = None,
+        seed_order: Optional[np.ndarray] = None,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Dict:
+        """Island-model GA: evolve sub-populations in worker processes.
+
+        Every `migration_interval` generations the best `migrants` chromosomes of
+        each island replace the worst of its neighbour (ring topology).
+        """
+        rng = rng or np.random.default_rng()
+        island_size = max(4, self.population_size // self.islands)
+        populations = [
+            self._initial_population(
+                profile,
+                island_size,
+                rng,
+                seed_heuristic=(island == 0),
+                seed_order=seed_order if island == 0 else None,
+            )
+            for island in range(self.islands)
+        ]
+        settings = {
+            "crossover_rate": self.crossover_rate,
+            "mutation_rate": self.mutation_rate,
+            "crossover": self.crossover,
+            "mutation": self.mutation,
+        }
+        # Per-task labels stay in this process; workers only need the arrays
+        worker_profile = {key: value for key, value in profile.items() if key != "metrics"}
+        pool = _get_island_pool(self.pool_size)
 
-            while len(next_population) < self.population_size:
-                parent1 = self._tournament_select(scored_population)
-                parent2 = self._tournament_select(scored_population)
-                child = self._crossover(parent1, parent2)
-                child = self._mutate(child)
-                next_population.append(child)
+        fitness_history: List[float] = []
+        best_chromosome = populations[0][0].copy()
+        best_fitness = float("-inf")
+        best_generation = 0
+        stop_reason = "generations"
+        completed = 0
+
+        while completed < self.generations:
+            epoch = min(self.migration_interval, self.generations - completed)
+            budget_s = None
+            if deadline is not None:
+                budget_s = max(0.0, deadline - time.perf_counter())
+            futures = [
+                pool.submit(
+                    _run_island,
+                    settings,
+                    worker_profile,
+                    population,
+                    epoch,
+                    budget_s,
+                    int(rng.integers(0, 2**31 - 1)),
+                )
+                for population in populations
+            ]
+            results = [future.result() for future in futures]
+
+            epoch_length = max(len(result["history"]) for result in results)
+            for step in range(epoch_length):
+                fitness_history.append(max(
+                    result["history"][step] for result in results if step < len(result["history"])
+                ))
+            for result in results:
+                if result["fitness"] > best_fitness:
+                    best_fitness = result["fitness"]
+                    best_chromosome = result["best"]
+                    best_generation = completed + result["generation"]
+            completed += epoch_length
+            populations = [result["population"] for result in results]
+
+            if profile["weight"].shape[0] < 2:
+                stop_reason = "trivial"
+                break
+            if any(result["stopReason"] == "budget" for result in results):
+                stop_reason = "budget"
+                break
+            if patience and completed - best_generation >= patience:
+                stop_reason = "plateau"
+                break
+
+            populations = self._migrate(populations, profile)
 
-            population = next_population
+        return {
+            "best": best_chromosome,
+            "fitness": best_fitness,
+            "generation": best_generation,
+            "history": fitness_history,
+            "stopReason": stop_reason,
+            "population": None,
+        }
+
+    def _migrate(self, populations: List[np.ndarray], profile: Dict) -> List[np.ndarray]:
+        ranked = []
+        for population in populations:
+            fitness = self._population_fitness(population, profile)
+            ranked.append(population[np.argsort(-fitness, kind="stable")])
+
+        migrants = min(self.migrants, ranked[0].shape[0] // 2)
+        if migrants <= 0:
+            return ranked
+        for island, population in enumerate(ranked):
+            source = ranked[island - 1]
+            population[-migrants:] = source[:migrants]
+        return ranked
+
+    def _solve_assignment(self, profile: Dict) -> np.ndarray:
+        """Return the provably optimal order for the task x position assignment.
+
+        A task's gain at position p is (lead + lag) * remaining_p minus a term
+        that does not depend on p, so the assignment matrix factors per task and
+        (rearrangement inequality) sorting by lead + lag, largest first, is
+        optimal in O(n log n).
+        """
+        key = profile["weight"] + profile["mood_lead"] + profile["mood_lag"]
+        return np.argsort(-key, kind="stable").astype(np.int64)
+
+    def _has_cross_task_terms(self, profile: Dict) -> bool:
+        """Whether the objective couples tasks beyond their own position.
 
+        All fitness terms depend only on a task and its slot; precedence
+        constraints between todos are what break the plain assignment form.
+        """
+        return bool(profile["level_edges"])
+
+    def _repair(self, population: np.ndarray, profile: Dict) -> np.ndarray:
+        return ga_operators.precedence_repair(population, profile["levels"], profile["level_edges"])
+
+    def _build_result(self, tasks: List[Dict], order: np.ndarray, profile: Dict, metadata: Dict) -> Dict:
+        base_metrics = profile["metrics"]
         summary = {"high": 0, "medium": 0, "low": 0}
         for metrics in base_metrics:
             summary[metrics["label"]] += 1
 
         ordered_tasks = []
-        if best_chromosome is None:
-            best_chromosome = heuristic_order
-
-        for rank, task_idx in enumerate(best_chromosome, start=1):
+        for rank, task_idx in enumerate(order.tolist(), start=1):
             task_copy = dict(tasks[task_idx])
             metrics = base_metrics[task_idx]
             task_copy["heuristicPriority"] = metrics["label"]
@@ -820,83 +1424,161 @@ class TaskSchedulerGA:
 
         return {
             "schedule": ordered_tasks,
-            "metadata": {
-                "fitness": best_fitness,
-                "evaluatedGenerations": best_generation,
-                "fitnessHistory": fitness_history,
-                "prioritySummary": summary,
-            },
+            "metadata": {**metadata, "prioritySummary": summary},
         }
 
-    def _fitness(
-        self,
-        chromosome: List[int],
-        tasks: List[Dict],
-        base_metrics: List[Dict],
-        context: Dict,
-    ) -> float:
-        total_score = 0.0
-        penalty = 0.0
-        mood_bonus = 0.0
-        total_tasks = len(chromosome)
-
-        for position, task_idx in enumerate(chromosome):
-            metrics = base_metrics[task_idx]
-            task = tasks[task_idx]
+    def _task_profile(self, tasks: List[Dict], context: Dict) -> Dict:
+        """Precompute the per-task arrays used by the fitness function."""
+        num_tasks = len(tasks)
+        now = datetime.now(timezone.utc)
+        mood = (context.get("mood") or "").lower()
+        priority_map = {"high": 3, "medium": 2, "low": 1}
+
+        metrics = []
+        weight = np.empty(num_tasks)
+        score = np.empty(num_tasks)
+        deadline_bonus = np.zeros(num_tasks)
+        mood_lead = np.zeros(num_tasks)
+        mood_lag = np.zeros(num_tasks)
 
-            priority_component = metrics["weight"] * (total_tasks - position)
-            score_component = metrics["score"] * 0.1
-            total_score += priority_component + score_component
+        for idx, task in enumerate(tasks):
+            label, task_score = self.prioritizer.heuristic_priority(task, context)
+            metrics.append({"index": idx, "label": label, "score": task_score, "weight": priority_map[label]})
+            weight[idx] = priority_map[label]
+            score[idx] = task_score
 
-            days_remaining = self._days_until_deadline(task)
+            days_remaining = self._days_until_deadline(task, now)
             if days_remaining is not None:
                 if days_remaining < 0:
-                    penalty += abs(days_remaining) * 5
+                    deadline_bonus[idx] = -abs(days_remaining) * 5
                 elif days_remaining <= 2:
-                    total_score += 2
+                    deadline_bonus[idx] = 2
                 elif days_remaining > 7:
-                    total_score -= 0.5
+                    deadline_bonus[idx] = -0.5
+
+            mood_lead[idx], mood_lag[idx] = self._mood_coefficients(task, mood)
+
+        return {
+            "metrics": metrics,
+            "weight": weight,
+            "score": score,
+            "deadline_bonus": deadline_bonus,
+            "mood_lead": mood_lead,
+            "mood_lag": mood_lag,
+            # Position-independent part of the objective is identical for every chromosome
+            "constant": float(score.sum() * 0.1 + deadline_bonus.sum()),
+            **self._precedence_graph(tasks),
+        }
 
-            mood_bonus += self._mood_bonus(task, context, position, total_tasks)
+    def _precedence_graph(self, tasks: List[Dict]) -> Dict:
+        """Build level-grouped edge arrays from each todo's `dependencies` ids.
 
-        return total_score - penalty + mood_bonus
+        Dependencies on todos outside the list (completed or deleted) are
+        already satisfied and ignored. Edges inside a dependency cycle (a
+        strongly connected component) are dropped so every remaining
+        constraint can be met; edges into and out of the cycle are kept.
+        """
+        num_tasks = len(tasks)
+        id_to_index = {}
+        for idx, task in enumerate(tasks):
+            task_id = task.get("id") or task.get("_id")
+            if task_id is not None:
+                id_to_index[str(task_id)] = idx
+
+        edges = set()
+        for target, task in enumerate(tasks):
+            for dependency in task.get("dependencies") or []:
+                dependency_id = dependency.get("id") if isinstance(dependency, dict) else dependency
+                source = id_to_index.get(str(dependency_id))
+                if source is not None and source != target:
+                    edges.add((source, target))
+
+        levels = np.zeros(num_tasks, dtype=np.int64)
+        if not edges:
+            return {"levels": levels, "level_edges": [], "dependency_edges": 0}
+
+        edge_array = np.array(sorted(edges), dtype=np.int64)
+        sources, targets = edge_array[:, 0], edge_array[:, 1]
+        levels, unresolved = self._topological_levels(num_tasks, sources, targets)
+        if unresolved.any():
+            if SCIPY_AVAILABLE:
+                # Only edges inside a strongly connected component form cycles;
+                # tasks merely downstream of one keep their constraints
+                graph = csr_matrix((np.ones(sources.shape[0]), (sources, targets)), shape=(num_tasks, num_tasks))
+                _, labels = connected_components(graph, directed=True, connection="strong")
+                keep = labels[sources] != labels[targets]
+            else:
+                keep = ~(unresolved[sources] & unresolved[targets])
+            logger.warning(f"Dropping {int((~keep).sum())} dependency edges that form cycles")
+            sources, targets = sources[keep], targets[keep]
+            levels, _ = self._topological_levels(num_tasks, sources, targets)
+
+        # Group edges by the depth of their target, then by target, so repair can
+        # sweep level by level with one segmented max per level
+        order = np.lexsort((targets, levels[targets]))
+        sources, targets = sources[order], targets[order]
+        boundaries = np.flatnonzero(np.diff(levels[targets])) + 1
+        level_edges = []
+        for level_sources, level_targets in zip(np.split(sources, boundaries), np.split(targets, boundaries)):
+            starts = np.concatenate([[0], np.flatnonzero(np.diff(level_targets)) + 1])
+            level_edges.append((level_sources, level_targets[starts], starts))
+        return {"levels": levels, "level_edges": level_edges, "dependency_edges": int(sources.shape[0])}
 
-    def _crossover(self, parent1: List[int], parent2: List[int]) -> List[int]:
-        if random.random() > self.crossover_rate:
-            return parent1[:]
+    @staticmethod
+    def _topological_levels(num_tasks: int, sources: np.ndarray, targets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Layered Kahn's algorithm: longest-path depth per task, plus tasks stuck in cycles."""
+        indegree = np.bincount(targets, minlength=num_tasks)
+        edge_order = np.argsort(sources, kind="stable")
+        successor_ptr = np.concatenate([[0], np.cumsum(np.bincount(sources, minlength=num_tasks))])
+        successors = targets[edge_order]
+
+        levels = np.zeros(num_tasks, dtype=np.int64)
+        frontier = np.flatnonzero(indegree == 0)
+        depth = 0
+        while frontier.size:
+            released = np.concatenate([successors[successor_ptr[node]:successor_ptr[node + 1]] for node in frontier])
+            np.subtract.at(indegree, released, 1)
+            depth += 1
+            frontier = np.unique(released[indegree[released] == 0])
+            levels[frontier] = depth
+        return levels, indegree > 0
+
+    def _population_fitness(self, population: np.ndarray, profile: Dict) -> np.ndarray:
+        """Score every chromosome of a ``(pop, n)`` population matrix at once."""
+        total_tasks = population.shape[1]
+        remaining = np.arange(total_tasks, 0, -1, dtype=float)
+        lead = profile["weight"] + profile["mood_lead"]
+        return (
+            (lead[population] * remaining).sum(axis=1)
+            - (profile["mood_lag"][population] * (total_tasks + 1 - remaining)).sum(axis=1)
+            + profile["constant"]
+        )
 
-        size = len(parent1)
-        start, end = sorted(random.sample(range(size), 2))
-        child = [None] * size
-        child[start:end] = parent1[start:end]
+    def _breed(self, ranked_population: np.ndarray, fitness: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Produce the non-elite rows of the next generation in one batch.
 
-        pointer = 0
-        for gene in parent2:
-            if gene not in child:
-                while child[pointer] is not None:
-                    pointer += 1
-                child[pointer] = gene
-
-        return child
-
-    def _mutate(self, chromosome: List[int]) -> List[int]:
-        if random.random() > self.mutation_rate:
-            return chromosome
-
-        mutated = chromosome[:]
-        i, j = random.sample(range(len(mutated)), 2)
-        mutated[i], mutated[j] = mutated[j], mutated[i]
-        return mutated
-
-    def _tournament_select(self, scored_population: List[Tuple[float, List[int]]]) -> List[int]:
-        pool_size = max(3, min(len(scored_population), max(5, len(scored_population) // 2)))
-        pool = scored_population[:pool_size]
-        k = min(len(pool), 3)
-        contenders = random.sample(pool, k)
-        contenders.sort(key=lambda item: item[0], reverse=True)
-        return contenders[0][1][:]
-
-    def _days_until_deadline(self, task: Dict) -> Optional[int]:
+        ranked_population and fitness must be sorted best first.
+        """
+        population_size = ranked_population.shape[0]
+        elite_count = min(population_size, max(2, population_size // 5))
+        offspring = population_size - elite_count
+        if offspring <= 0:
+            return ranked_population[:0]
+
+        pool_size = max(3, min(population_size, max(5, population_size // 2)))
+        parents = ga_operators.tournament_select(fitness, 2 * offspring, rng, pool_size=pool_size)
+        children = ranked_population[parents[:offspring]]
+        partners = ranked_population[parents[offspring:]]
+
+        crossed = rng.random(offspring) < self.crossover_rate
+        if crossed.any():
+            children[crossed] = self._crossover_op(children[crossed], partners[crossed], rng)
+        mutated = rng.random(offspring) < self.mutation_rate
+        if mutated.any():
+            children[mutated] = self._mutation_op(children[mutated], rng)
+        return children
+
+    def _days_until_deadline(self, task: Dict, now: Optional[datetime] = None) -> Optional[int]:
         deadline = task.get("deadline")
         if not deadline:
             return None
@@ -905,23 +1587,69 @@ class TaskSchedulerGA:
                 deadline_dt = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
             else:
                 deadline_dt = deadline
-            return (deadline_dt - datetime.now(timezone.utc)).days
+            return (deadline_dt - (now or datetime.now(timezone.utc))).days
         except Exception:
             return None
 
-    def _mood_bonus(self, task: Dict, context: Dict, position: int, total_tasks: int) -> float:
-        mood = (context.get("mood") or "").lower()
-        if not mood:
-            return 0.0
+    def _mood_coefficients(self, task: Dict, mood: str) -> Tuple[float, float]:
+        """Return (lead, lag) mood multipliers for a task.
 
-        difficulty = task.get("difficulty", "medium").lower()
-        position_factor = max(0, total_tasks - position)
+        The bonus at a position is ``lead * (n - position) - lag * (position + 1)``.
+        """
+        if not mood:
+            return 0.0, 0.0
 
+        difficulty = (task.get("difficulty") or "medium").lower()
         if mood in {"focused", "okay", "energetic"} and difficulty in {"hard", "medium"}:
-            return position_factor * 0.5
+            return 0.5, 0.0
         if mood in {"sad", "very_sad", "tired"} and difficulty == "hard":
-            return -1.0 * (position + 1)
-        return 0.0
+            return 0.0, 1.0
+        return 0.0, 0.0
+
+_island_pools: Dict[Optional[int], ProcessPoolExecutor] = {}
+_island_pool_lock = threading.Lock()
+
+
+def _get_island_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Shared worker pool for island GA runs, one per `max_workers`, created on first use.
+
+    Workers come from a forkserver (spawn where that is unavailable): forking
+    the multithreaded Flask process could copy a lock held by another thread
+    and deadlock the child. Each worker still re-imports the entry module as
+    ``__mp_main__``, so entry points must keep import-time side effects behind
+    a guard (app.py checks IS_POOL_WORKER).
+    """
+    with _island_pool_lock:
+        if max_workers not in _island_pools:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                # The server process needs only this module, not the entry point (e.g. app.py)
+                context.set_forkserver_preload(["ml_models"])
+            else:
+                context = multiprocessing.get_context("spawn")
+            _island_pools[max_workers] = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+        return _island_pools[max_workers]
+
+
+def _run_island(
+    settings: Dict,
+    profile: Dict,
+    population: np.ndarray,
+    generations: int,
+    budget_s: Optional[float],
+    seed: int,
+) -> Dict:
+    """Evolve one island for an epoch; runs inside a pool worker."""
+    scheduler = TaskSchedulerGA(population_size=population.shape[0], **settings)
+    deadline = time.perf_counter() + budget_s if budget_s is not None else None
+    # Each island gets its own seed so reused workers never repeat a stream
+    return scheduler._evolve(
+        profile,
+        population=population,
+        generations=generations,
+        deadline=deadline,
+        rng=np.random.default_rng(seed),
+    )
 
 # ==================== 4. Note Classification (SVM) ====================
 
@@ -996,40 +1724,344 @@ class NoteClassifier:
             logger.error(f"Error predicting note class: {e}")
             return ('Other', 0.0)
 
+# ==================== Model Registry ====================
+
+class ModelRegistry:
+    """Fitted per-user models keyed by a fingerprint of their training data.
+
+    A model is only refit when the caller's data fingerprint differs from the
+    one it was fitted on; otherwise the cached instance is served. Refits run on
+    a fresh instance that is swapped in when done, so concurrent requests keep
+    using the previous model. With a directory set, entries are pickled to disk
+    and survive restarts. Incremental refits get a copy of the served model to
+    update instead of a fresh one.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._entries: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+        self._fit_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def set_directory(self, directory: Optional[str]) -> None:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def _path(self, kind: str, user_id: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        digest = hashlib.sha256(str(user_id).encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self.directory, f"{kind}-{digest}.pkl")
+
+    def _entry(self, kind: str, user_id: str) -> Optional[Dict]:
+        key = (kind, user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+        path = self._path(kind, user_id)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as handle:
+                entry = pickle.load(handle)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable {kind} model for {user_id}: {e}")
+            return None
+        with self._lock:
+            return self._entries.setdefault(key, entry)
+
+    def get(self, kind: str, user_id: str, factory: Callable[[], object]) -> object:
+        """Return the current model, creating an unfitted one if none exists."""
+        entry = self._entry(kind, user_id)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.setdefault((kind, user_id), {"fingerprint": None, "fitted": False, "model": factory()})
+        return entry["model"]
+
+    def current(self, kind: str, user_id: str, factory: Callable[[], object]) -> Tuple[object, bool, Optional[str]]:
+        """(model, fitted, fingerprint) as currently served, without fitting."""
+        model = self.get(kind, user_id, factory)
+        entry = self._entry(kind, user_id)
+        return model, entry["fitted"], entry["fingerprint"]
+
+    def is_fitted(self, kind: str, user_id: str) -> bool:
+        entry = self._entry(kind, user_id)
+        return bool(entry and entry["fitted"])
+
+    def refit(
+        self,
+        kind: str,
+        user_id: str,
+        data_fingerprint: str,
+        factory: Callable[[], object],
+        fit: Callable[[object], bool],
+        incremental: bool = False,
+    ) -> Tuple[object, bool]:
+        """Fit a fresh model unless one for `data_fingerprint` already exists.
+
+        fit(model) loads its own training data, so callers pay for that only on
+        a refit. It returns whether fitting succeeded; failures are recorded too,
+        so unchanged data that cannot be fitted is not retried on every call.
+        With `incremental`, fit receives a deep copy of the served fitted model
+        (when there is one) so it can update it rather than start over.
+        Returns (model, fitted).
+        """
+        key = (kind, user_id)
+        with self._lock:
+            fit_lock = self._fit_locks.setdefault(key, threading.Lock())
+        with fit_lock:
+            entry = self._entry(kind, user_id)
+            if entry is not None and entry["fingerprint"] == data_fingerprint:
+                return entry["model"], entry["fitted"]
+
+            if incremental and entry is not None and entry["fitted"]:
+                model = copy.deepcopy(entry["model"])
+            else:
+                model = factory()
+            if fit(model):
+                entry = {"fingerprint": data_fingerprint, "fitted": True, "model": model}
+            elif entry is not None and entry["fitted"]:
+                # Keep serving the last good model, but remember this data failed
+                entry = {**entry, "fingerprint": data_fingerprint}
+            else:
+                entry = {"fingerprint": data_fingerprint, "fitted": False, "model": model}
+            with self._lock:
+                self._entries[key] = entry
+            self._persist(kind, user_id, entry)
+            return entry["model"], entry["fitted"]
+
+    def _persist(self, kind: str, user_id: str, entry: Dict) -> None:
+        path = self._path(kind, user_id)
+        if not path:
+            return
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as handle:
+                pickle.dump(entry, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not persist {kind} model for {user_id}: {e}")
+
+
+model_registry = ModelRegistry()
+
+
+class TrainingQueue:
+    """Runs registry refits on a bounded background pool instead of the request thread.
+
+    At most one job per (kind, user) is queued or running. A request for newer
+    data while a job runs is remembered and started when it finishes. Callers
+    get the currently served model straight away; the refit is swapped in by
+    the registry once done. Threads rather than processes because fit
+    callbacks close over database handles; the heavy parts (NumPy, XGBoost,
+    libsvm) release the GIL.
+    """
+
+    def __init__(self, registry: ModelRegistry, max_workers: int = 1, max_pending: int = 64):
+        self.registry = registry
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ml-training")
+        self._lock = threading.Lock()
+        self._jobs: Dict[Tuple[str, str], Dict] = {}
+        self._results: Dict[Tuple[str, str], Dict] = {}
+
+    def submit(
+        self,
+        kind: str,
+        user_id: str,
+        data_fingerprint: str,
+        factory: Callable[[], object],
+        fit: Callable[[object], bool],
+        incremental: bool = False,
+    ) -> Tuple[object, bool, str]:
+        """Queue a refit unless the served model already matches the data.
+        `incremental` is passed on to ModelRegistry.refit.
+
+        Returns (model, fitted, state) where state is "ready", "queued",
+        "running" or "busy" (queue full; try again later).
+        """
+        key = (kind, user_id)
+        model, fitted, served_fingerprint = self.registry.current(kind, user_id, factory)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                if job["fingerprint"] != data_fingerprint:
+                    job["next"] = (data_fingerprint, factory, fit, incremental)
+                return model, fitted, job["state"]
+            if served_fingerprint == data_fingerprint:
+                return model, fitted, "ready"
+            if len(self._jobs) >= self.max_pending:
+                return model, fitted, "busy"
+            self._start(key, data_fingerprint, factory, fit, incremental)
+        return model, fitted, "queued"
+
+    def status(self, user_id: str) -> Dict[str, Dict]:
+        """Queue state and last result of every model kind for a user."""
+        report = {}
+        with self._lock:
+            for (kind, owner), result in self._results.items():
+                if owner == user_id:
+                    report[kind] = dict(result)
+            for (kind, owner), job in self._jobs.items():
+                if owner == user_id:
+                    report.setdefault(kind, {})
+                    report[kind].update({"state": job["state"], "queuedAt": job["queuedAt"]})
+        for kind in report:
+            report[kind]["fitted"] = self.registry.is_fitted(kind, user_id)
+        return report
+
+    def _start(self, key: Tuple[str, str], data_fingerprint: str, factory: Callable[[], object], fit: Callable[[object], bool],
+               incremental: bool = False) -> None:
+        # Caller holds self._lock
+        self._jobs[key] = {"state": "queued", "fingerprint": data_fingerprint, "queuedAt": datetime.now(timezone.utc).isoformat(), "next": None}
+        self._executor.submit(self._run, key, data_fingerprint, factory, fit, incremental)
+
+    def _run(self, key: Tuple[str, str], data_fingerprint: str, factory: Callable[[], object], fit: Callable[[object], bool],
+             incremental: bool = False) -> None:
+        kind, user_id = key
+        with self._lock:
+            self._jobs[key]["state"] = "running"
+        started = time.perf_counter()
+        result = {"state": "ready", "error": None}
+        try:
+            _, fitted = self.registry.refit(kind, user_id, data_fingerprint, factory, fit, incremental)
+            if not fitted:
+                result["state"] = "unfitted"
+        except Exception as e:
+            logger.exception(f"Background {kind} training failed for {user_id}: {e}")
+            result = {"state": "failed", "error": str(e)}
+        result["finishedAt"] = datetime.now(timezone.utc).isoformat()
+        result["durationMs"] = round((time.perf_counter() - started) * 1000, 1)
+
+        with self._lock:
+            self._results[key] = result
+            follow_up = self._jobs.pop(key)["next"]
+            if follow_up is not None and follow_up[0] != data_fingerprint:
+                self._start(key, *follow_up)
+
+class SharedRecommenders:
+    """One RecommendationEngine per item type (book, playlist, ...), shared by all users.
+
+    Requests only look the current engine up. The one thing they mutate on it
+    is the engine's `_neighbours` memo, which is safe to share across request
+    threads only because each of its dict assignments is atomic (a race at
+    worst computes the same neighbours twice). A replacement is fitted on a
+    background thread once `refresh_interval` seconds have passed or
+    `refresh_after` rating changes have been noted since the last build, then
+    swapped in under the lock. Only the very first request for a type waits,
+    for the initial build.
+    """
+
+    def __init__(self, load_ratings: Callable[[str], List[Dict]], refresh_interval: float = 600.0, refresh_after: int = 50):
+        self.load_ratings = load_ratings
+        self.refresh_interval = refresh_interval
+        self.refresh_after = refresh_after
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recommender-refresh")
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._entries: Dict[str, Dict] = {}
+        self._changes: Dict[str, int] = {}
+        self._refreshing = set()
+
+    def get(self, item_type: str) -> Optional[RecommendationEngine]:
+        """The current fitted engine for `item_type`, or None if there is too little data."""
+        with self._lock:
+            entry = self._entries.get(item_type)
+            stale = entry is not None and (
+                time.monotonic() - entry["builtAt"] >= self.refresh_interval
+                or self._changes.get(item_type, 0) >= self.refresh_after
+            )
+        if entry is None:
+            return self._build(item_type, cold=True)
+        if stale:
+            self._schedule(item_type)
+        return entry["engine"]
+
+    def note_change(self, item_type: str, count: int = 1) -> None:
+        """Record rating changes; enough of them trigger a background refresh."""
+        with self._lock:
+            self._changes[item_type] = self._changes.get(item_type, 0) + count
+            due = item_type in self._entries and self._changes[item_type] >= self.refresh_after
+        if due:
+            self._schedule(item_type)
+
+    def status(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                item_type: {
+                    "fitted": entry["engine"] is not None,
+                    "users": len(entry["engine"].user_ids) if entry["engine"] is not None else 0,
+                    "ratings": entry["ratings"],
+                    "ageSeconds": round(time.monotonic() - entry["builtAt"], 1),
+                    "pendingChanges": self._changes.get(item_type, 0),
+                    "refreshing": item_type in self._refreshing,
+                }
+                for item_type, entry in self._entries.items()
+            }
+
+    def _schedule(self, item_type: str) -> None:
+        with self._lock:
+            if item_type in self._refreshing:
+                return
+            self._refreshing.add(item_type)
+        self._executor.submit(self._refresh, item_type)
+
+    def _refresh(self, item_type: str) -> None:
+        try:
+            self._build(item_type)
+        except Exception as e:
+            logger.exception(f"Recommender refresh failed for {item_type}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(item_type)
+
+    def _build(self, item_type: str, cold: bool = False) -> Optional[RecommendationEngine]:
+        with self._lock:
+            build_lock = self._build_locks.setdefault(item_type, threading.Lock())
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(item_type)
+                # Concurrent first requests wait for one build and share it
+                if cold and entry is not None:
+                    return entry["engine"]
+                changes_seen = self._changes.get(item_type, 0)
+
+            ratings = self.load_ratings(item_type)
+            engine = RecommendationEngine()
+            fitted = engine.fit_user_based(ratings)
+            with self._lock:
+                self._entries[item_type] = {
+                    "engine": engine if fitted else None,
+                    "builtAt": time.monotonic(),
+                    "ratings": len(ratings),
+                }
+                # Changes noted while loading count towards the next refresh
+                self._changes[item_type] = self._changes.get(item_type, 0) - changes_seen
+            logger.info(f"Shared {item_type} recommender rebuilt from {len(ratings)} ratings")
+            return engine if fitted else None
+
+
 # Global instances (will be initialized per user)
-_recommendation_engines = {}
-_task_prioritizers = {}
-_mood_predictors = {}
-_note_classifiers = {}
 _task_schedulers = {}
 
-def get_recommendation_engine(user_id: str) -> RecommendationEngine:
-    """Get or create recommendation engine for user."""
-    if user_id not in _recommendation_engines:
-        _recommendation_engines[user_id] = RecommendationEngine()
-    return _recommendation_engines[user_id]
-
 def get_task_prioritizer(user_id: str) -> TaskPrioritizer:
-    """Get or create task prioritizer for user."""
-    if user_id not in _task_prioritizers:
-        _task_prioritizers[user_id] = TaskPrioritizer()
-    return _task_prioritizers[user_id]
+    """Get the user's current task prioritizer from the model registry."""
+    return model_registry.get("task_prioritizer", user_id, TaskPrioritizer)
 
 def get_mood_predictor(user_id: str) -> MoodPredictor:
-    """Get or create mood predictor for user."""
-    if user_id not in _mood_predictors:
-        _mood_predictors[user_id] = MoodPredictor()
-    return _mood_predictors[user_id]
+    """Get the user's current mood predictor from the model registry."""
+    return model_registry.get("mood_predictor", user_id, MoodPredictor)
 
 def get_note_classifier(user_id: str) -> NoteClassifier:
-    """Get or create note classifier for user."""
-    if user_id not in _note_classifiers:
-        _note_classifiers[user_id] = NoteClassifier()
-    return _note_classifiers[user_id]
+    """Get the user's current note classifier from the model registry."""
+    return model_registry.get("note_classifier", user_id, NoteClassifier)
 
-def get_task_scheduler(user_id: str) -> TaskSchedulerGA:
-    """Get or create GA-based task scheduler for user."""
+def get_task_scheduler(user_id: str, **options) -> TaskSchedulerGA:
+    """Get or create GA-based task scheduler for user.
+    options are TaskSchedulerGA constructor arguments, applied on creation."""
     if user_id not in _task_schedulers:
-        _task_schedulers[user_id] = TaskSchedulerGA(get_task_prioritizer(user_id))
+        _task_schedulers[user_id] = TaskSchedulerGA(get_task_prioritizer(user_id), **options)
     return _task_schedulers[user_id]
 
@@ -0,0 +1,121 @@
+"""
+MongoDB aggregation pushdown for mood-model training data.
+
+Instead of pulling every mood, medication, todo and focus document into Python,
+each source is reduced server-side with ``$group`` by (user, UTC day). What comes
+back is one compact row per day in MoodPredictor.DAILY_COLUMNS shape (dominant
+mood, average entry hour, keyword hits, medication / completed-task counts and
+focus minutes), so transfer and Python work scale with days, not events.
+"""
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from ml_models import MoodPredictor
+
+
+def _as_date(*fields: str) -> Dict:
+    """First non-null of `fields` converted to a BSON date (null if it is not a date)."""
+    value = f"${fields[-1]}"
+    for field in reversed(fields[:-1]):
+        value = {"$ifNull": [f"${field}", value]}
+    return {"$convert": {"input": value, "to": "date", "onError": None, "onNull": None}}
+
+
+def _utc_day(expression) -> Dict:
+    return {"$dateToString": {"format": "%Y-%m-%d", "date": expression}}
+
+
+def _per_day_totals(
+    collection, match: Dict, date_fields: List[str], value=1, since: Optional[datetime] = None
+) -> Dict[str, int]:
+    """Sum `value` per UTC day of the first non-null `date_fields`, from `since` on.
+
+    The window is matched on that same coalesced date after ``$set``, so rows
+    are windowed and bucketed by one date.
+    """
+    when = {"$ne": None}
+    if since is not None:
+        when["$gte"] = since
+    pipeline = [
+        {"$match": match},
+        {"$set": {"_when": _as_date(*date_fields)}},
+        {"$match": {"_when": when}},
+        {"$group": {"_id": _utc_day("$_when"), "total": {"$sum": value}}},
+    ]
+    return {row["_id"]: row["total"] for row in collection.aggregate(pipeline)}
+
+
+def _mood_days_pipeline(user_id: str, since: Optional[datetime]) -> List[Dict]:
+    match = {"userId": user_id}
+    if since is not None:
+        match["date"] = {"$gte": since}
+    words = MoodPredictor.POSITIVE_WORDS + MoodPredictor.NEGATIVE_WORDS + MoodPredictor.SOCIAL_WORDS
+    word_flags = {
+        f"w_{word}": {"$max": {"$cond": [{"$regexMatch": {"input": "$_note", "regex": re.escape(word)}}, 1, 0]}}
+        for word in words
+    }
+
+    def hits(group: List[str]) -> Dict:
+        return {"$add": [f"$w_{word}" for word in group]}
+
+    return [
+        {"$match": match},
+        {"$set": {"_when": _as_date("date"), "_note": {"$toLower": {"$ifNull": ["$note", ""]}}}},
+        {"$match": {"_when": {"$ne": None}}},
+        # Per (day, mood): how often, how recently, entry hours and keyword flags
+        {"$group": {
+            "_id": {"day": _utc_day("$_when"), "mood": {"$ifNull": ["$mood", ""]}},
+            "count": {"$sum": 1},
+            "latest": {"$max": "$_when"},
+            "hourSum": {"$sum": {"$hour": "$_when"}},
+            **word_flags,
+        }},
+        # Dominant mood first; ties go to the most recent entry, as in aggregate_daily
+        {"$sort": {"count": -1, "latest": -1}},
+        {"$group": {
+            "_id": "$_id.day",
+            "mood": {"$first": "$_id.mood"},
+            "entries": {"$sum": "$count"},
+            "hourSum": {"$sum": "$hourSum"},
+            **{name: {"$max": f"${name}"} for name in word_flags},
+        }},
+        {"$project": {
+            "_id": 0,
+            "day": "$_id",
+            "mood": 1,
+            "avg_hour": {"$divide": ["$hourSum", "$entries"]},
+            "positive_words": hits(MoodPredictor.POSITIVE_WORDS),
+            "negative_words": hits(MoodPredictor.NEGATIVE_WORDS),
+            "social_words": hits(MoodPredictor.SOCIAL_WORDS),
+        }},
+        {"$sort": {"day": 1}},
+    ]
+
+
+def daily_mood_rows(db, user_id: str, since: Optional[datetime] = None) -> pd.DataFrame:
+    """One MoodPredictor.DAILY_COLUMNS row per day with a mood entry, oldest first."""
+    daily = pd.DataFrame(list(db["moods"].aggregate(_mood_days_pipeline(user_id, since))))
+    if daily.empty:
+        return pd.DataFrame(columns=MoodPredictor.DAILY_COLUMNS)
+
+    medications = _per_day_totals(db["medications"], {"userId": user_id}, ["date", "takenAt"], since=since)
+    tasks = _per_day_totals(
+        db["todos"],
+        {"userId": user_id, "completed": True},
+        ["completedAt", "createdAt"],
+        since=since,
+    )
+    focus = _per_day_totals(
+        db["focus_sessions"],
+        {"userId": user_id, "status": "completed"},
+        ["startTime"],
+        {"$floor": {"$divide": [{"$ifNull": ["$duration", 0]}, 60]}},
+        since=since,
+    )
+    daily["medications"] = daily["day"].map(medications).fillna(0).astype(int)
+    daily["tasks_completed"] = daily["day"].map(tasks).fillna(0).astype(int)
+    daily["focus_minutes"] = daily["day"].map(focus).fillna(0).astype(int)
+    return daily[MoodPredictor.DAILY_COLUMNS]